@@ -1,12 +1,43 @@
-from .whatsapp_bot import configurar_navegador, esperar_inicio_sesion, verificar_envio, enviar_mensaje, guardar_registro, verificar_dependencias
-from .sms_sender import SMSService
-
-__all__ = [
-    'configurar_navegador',
-    'esperar_inicio_sesion',
-    'verificar_envio',
-    'enviar_mensaje',
-    'guardar_registro',
-    'verificar_dependencias',
-    'SMSService'
-]
\ No newline at end of file
+from importlib import import_module
+
+# Nombre exportado -> submódulo que lo define. Se importan al primer uso
+# (PEP 562) para que importar app.core no cargue selenium, pandas ni aiohttp.
+_EXPORTACIONES = {
+    'configurar_navegador': 'whatsapp_bot',
+    'esperar_inicio_sesion': 'whatsapp_bot',
+    'verificar_envio': 'whatsapp_bot',
+    'enviar_mensaje': 'whatsapp_bot',
+    'guardar_registro': 'whatsapp_bot',
+    'verificar_dependencias': 'dependencies',
+    'SMSService': 'sms_sender',
+    'ruta_perfil': 'browser_profiles',
+    'listar_perfiles': 'browser_profiles',
+    'eliminar_perfil': 'browser_profiles',
+    'PoolEnvio': 'sending_pool',
+    'cuentas_predeterminadas': 'sending_pool',
+    'CampanaEnvio': 'campaign_runner',
+    'ControlCampana': 'campaign_runner',
+    'DiarioEnvios': 'send_journal',
+    'leer_diario': 'send_journal',
+    'generar_reporte': 'send_journal',
+    'IndiceCampana': 'campaign_state',
+    'id_campana': 'campaign_state',
+    'CacheNumerosInvalidos': 'invalid_numbers',
+    'MetricasEnvio': 'metrics',
+    'TiemposEnvio': 'metrics',
+}
+
+__all__ = list(_EXPORTACIONES)
+
+
+def __getattr__(nombre):
+    modulo = _EXPORTACIONES.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(import_module(f".{modulo}", __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,54 @@
+import os
+import re
+import shutil
+from typing import List
+
+# Carpeta donde se guardan los perfiles de Chrome (uno por cuenta de envío)
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+DIRECTORIO_PERFILES = os.path.join(ROOT_PATH, "perfiles")
+PERFIL_PREDETERMINADO = "principal"
+
+
+def normalizar_nombre_perfil(cuenta: str) -> str:
+    """Convierte el nombre de la cuenta en un nombre de carpeta seguro"""
+    nombre = re.sub(r"[^A-Za-z0-9_+-]", "_", str(cuenta).strip())
+    if not nombre:
+        raise ValueError("El nombre de la cuenta no puede estar vacío")
+    return nombre
+
+
+def ruta_perfil(cuenta: str = PERFIL_PREDETERMINADO) -> str:
+    """Retorna (y crea si no existe) la carpeta user-data-dir de una cuenta"""
+    ruta = os.path.join(DIRECTORIO_PERFILES, normalizar_nombre_perfil(cuenta))
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def listar_perfiles() -> List[str]:
+    """Lista las cuentas que ya tienen un perfil guardado"""
+    if not os.path.isdir(DIRECTORIO_PERFILES):
+        return []
+    return sorted(
+        nombre for nombre in os.listdir(DIRECTORIO_PERFILES)
+        if os.path.isdir(os.path.join(DIRECTORIO_PERFILES, nombre))
+    )
+
+
+def perfil_en_uso(cuenta: str) -> bool:
+    """Indica si otra instancia de Chrome tiene abierto el perfil"""
+    ruta = os.path.join(DIRECTORIO_PERFILES, normalizar_nombre_perfil(cuenta))
+    # Chrome deja estos archivos mientras el perfil está abierto
+    # ("SingletonLock" en Linux/macOS, "lockfile" en Windows)
+    return any(
+        os.path.lexists(os.path.join(ruta, bloqueo))
+        for bloqueo in ("SingletonLock", "lockfile")
+    )
+
+
+def eliminar_perfil(cuenta: str) -> bool:
+    """Borra el perfil de una cuenta (obliga a escanear el QR de nuevo)"""
+    ruta = os.path.join(DIRECTORIO_PERFILES, normalizar_nombre_perfil(cuenta))
+    if not os.path.isdir(ruta):
+        return False
+    shutil.rmtree(ruta, ignore_errors=True)
+    return True
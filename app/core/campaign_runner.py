@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Sequence, Tuple
+
+from .campaign_state import IndiceCampana
+from .metrics import MetricasEnvio
+from .send_journal import DiarioEnvios, generar_reporte
+from .sending_pool import PoolEnvio
+
+
+class ControlCampana:
+    """Pausa, reanudación y cancelación de una campaña entre mensajes"""
+
+    def __init__(self):
+        self._activa = threading.Event()
+        self._activa.set()
+        self._cancelada = threading.Event()
+
+    def pausar(self) -> None:
+        self._activa.clear()
+
+    def reanudar(self) -> None:
+        self._activa.set()
+
+    def cancelar(self) -> None:
+        self._cancelada.set()
+        # Despertar a los hilos que estén en pausa para que terminen
+        self._activa.set()
+
+    @property
+    def pausada(self) -> bool:
+        return not self._activa.is_set()
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada.is_set()
+
+    def esperar_turno(self) -> bool:
+        """Bloquea mientras la campaña está en pausa.
+
+        Retorna False si la campaña fue cancelada.
+        """
+        self._activa.wait()
+        return not self._cancelada.is_set()
+
+
+class CampanaEnvio(threading.Thread):
+    """Ejecuta una campaña de WhatsApp fuera del hilo de la interfaz
+
+    El progreso se publica en `self.eventos` (queue.Queue) como diccionarios
+    con la clave "tipo": "progreso", "fin" o "error". La interfaz debe leer
+    la cola periódicamente con `after()`; este hilo nunca toca widgets.
+
+    Si se indica `diario`, cada resultado se agrega a él apenas termina y al
+    final se regenera el reporte de texto `ruta_reporte` con los registros
+    de esta ejecución (marcados con "ejecucion"), leyendo el diario solo
+    desde donde empezó.
+    Con `indice` (IndiceCampana) cada mensaje enviado (su burbuja apareció,
+    con o sin check) queda marcado para poder reanudar la campaña sin
+    repetir destinatarios. Con `metricas` (MetricasEnvio) los tiempos por
+    fase de cada registro se acumulan y se exportan al terminar.
+    """
+
+    def __init__(
+        self,
+        pool: PoolEnvio,
+        envios: Sequence[Tuple[str, str]],
+        diario: Optional[DiarioEnvios] = None,
+        ruta_reporte: Optional[str] = None,
+        indice: Optional[IndiceCampana] = None,
+        metricas: Optional[MetricasEnvio] = None
+    ):
+        super().__init__(daemon=True)
+        self.pool = pool
+        self.envios = envios
+        self.diario = diario
+        self.ruta_reporte = ruta_reporte
+        self.indice = indice
+        self.metricas = metricas
+        self.control = ControlCampana()
+        self.ejecucion = uuid.uuid4().hex[:12]
+        self.eventos: "queue.Queue[Dict]" = queue.Queue()
+        self._completados = 0
+        self._exitosos = 0
+        self._inicio: Optional[float] = None
+
+    def run(self) -> None:
+        self._inicio = time.monotonic()
+        try:
+            marca = self.diario.marca() if self.diario is not None else None
+            try:
+                registros = self.pool.enviar(
+                    self.envios, al_registrar=self._al_registrar, control=self.control
+                )
+            finally:
+                if self.diario is not None:
+                    self.diario.cerrar()
+                if self.indice is not None:
+                    self.indice.cerrar()
+                if self.metricas is not None:
+                    self.metricas.exportar()
+            if self.diario is not None and self.ruta_reporte:
+                generar_reporte(
+                    self.ruta_reporte, self.diario.ruta,
+                    filtro=lambda r: r.get("ejecucion") == self.ejecucion,
+                    desde=self.diario.desde(marca)
+                )
+            self.eventos.put({
+                "tipo": "fin",
+                "registros": registros,
+                "cancelada": self.control.cancelada
+            })
+        except Exception as e:
+            self.eventos.put({"tipo": "error", "detalle": str(e)})
+
+    def _al_registrar(self, indice: int, registro: Dict) -> None:
+        """Guarda y publica el avance cada vez que termina un destinatario"""
+        registro["ejecucion"] = self.ejecucion
+        if self.indice is not None:
+            registro["campana"] = self.indice.campana
+            # Se marca apenas el mensaje salió: reanudar no debe repetirlo
+            # aunque el check no haya llegado a tiempo
+            if registro.get("enviado"):
+                self.indice.marcar(*self.envios[indice])
+        if self.diario is not None:
+            self.diario.registrar(registro)
+        if self.metricas is not None:
+            self.metricas.registrar(registro)
+        self._completados += 1
+        if registro.get("confirmado"):
+            self._exitosos += 1
+
+        total = len(self.envios)
+        transcurrido = time.monotonic() - self._inicio
+        por_minuto = self._completados / transcurrido * 60 if transcurrido > 0 else 0.0
+        restantes = total - self._completados
+        eta = restantes / (por_minuto / 60) if por_minuto > 0 else None
+
+        self.eventos.put({
+            "tipo": "progreso",
+            "indice": indice,
+            "registro": registro,
+            "completados": self._completados,
+            "exitosos": self._exitosos,
+            "total": total,
+            "mensajes_por_minuto": por_minuto,
+            "eta_segundos": eta
+        })
@@ -0,0 +1,70 @@
+import hashlib
+import os
+import threading
+from typing import List, Sequence, Tuple
+
+from .send_journal import RUTA_LOGS
+
+# Un archivo .idx por campaña con los destinatarios ya enviados
+RUTA_CAMPANAS = os.path.join(RUTA_LOGS, "campanas")
+
+
+def hash_mensaje(mensaje: str) -> str:
+    """Huella corta del mensaje renderizado"""
+    return hashlib.sha1(mensaje.encode("utf-8")).hexdigest()[:16]
+
+
+def clave_envio(telefono: str, mensaje: str) -> str:
+    """Clave de un envío: teléfono normalizado + huella del mensaje"""
+    return f"{telefono}|{hash_mensaje(mensaje)}"
+
+
+def id_campana(origen: str, plantilla: str) -> str:
+    """Identificador estable de una campaña: misma hoja + misma plantilla"""
+    contenido = f"{origen}\n{plantilla}".encode("utf-8")
+    return hashlib.sha1(contenido).hexdigest()[:12]
+
+
+class IndiceCampana:
+    """Índice persistente de los destinatarios ya enviados en una campaña
+
+    Se carga una sola vez en un set (consulta O(1) por destinatario) y cada
+    mensaje enviado se agrega al final del archivo, sin releer los logs.
+    """
+
+    def __init__(self, campana: str, ruta_base: str = RUTA_CAMPANAS):
+        self.campana = campana
+        os.makedirs(ruta_base, exist_ok=True)
+        self.ruta = os.path.join(ruta_base, f"{campana}.idx")
+        self._lock = threading.Lock()
+        self.completados = set()
+        if os.path.exists(self.ruta):
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                self.completados = {linea.strip() for linea in f if linea.strip()}
+        self._archivo = open(self.ruta, "a", encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(self.completados)
+
+    def contiene(self, telefono: str, mensaje: str) -> bool:
+        return clave_envio(telefono, mensaje) in self.completados
+
+    def marcar(self, telefono: str, mensaje: str) -> None:
+        """Registra un mensaje enviado"""
+        clave = clave_envio(telefono, mensaje)
+        with self._lock:
+            if clave in self.completados:
+                return
+            self.completados.add(clave)
+            self._archivo.write(clave + "\n")
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+
+    def pendientes(self, envios: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Filtra los (telefono, mensaje) que todavía no se han enviado"""
+        return [envio for envio in envios if not self.contiene(*envio)]
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if not self._archivo.closed:
+                self._archivo.close()
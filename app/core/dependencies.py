@@ -0,0 +1,31 @@
+import importlib.util
+from typing import List
+
+# Módulo que se importa -> paquete de requirements.txt
+DEPENDENCIAS = {
+    "selenium": "selenium",
+    "pandas": "pandas",
+    "webdriver_manager": "webdriver_manager",
+    "openpyxl": "openpyxl",
+    "customtkinter": "customtkinter",
+    "aiohttp": "aiohttp",
+}
+
+
+def dependencias_faltantes() -> List[str]:
+    """Paquetes no instalados. Solo se buscan (find_spec), no se importan"""
+    return [
+        paquete for modulo, paquete in DEPENDENCIAS.items()
+        if importlib.util.find_spec(modulo) is None
+    ]
+
+
+def verificar_dependencias():
+    """Verifica que todas las dependencias necesarias estén instaladas"""
+    faltantes = dependencias_faltantes()
+    if not faltantes:
+        print("✅ Todas las dependencias están instaladas correctamente")
+        return True
+    print(f"❌ Error: Falta instalar algunas dependencias: {', '.join(faltantes)}")
+    print("📝 Por favor, ejecuta: pip install -r requirements.txt")
+    return False
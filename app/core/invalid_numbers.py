@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, FrozenSet, Optional
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+ARCHIVO_NUMEROS_INVALIDOS = os.path.join(ROOT_PATH, "cache", "numeros_invalidos.json")
+
+# Días que un número se considera inválido antes de volver a intentarlo
+DIAS_VIGENCIA = 30
+
+MOTIVO_INVALIDO = "Número no registrado en WhatsApp"
+
+
+class CacheNumerosInvalidos:
+    """Números que WhatsApp reportó como inválidos, con vencimiento
+
+    Se guarda en disco como {telefono: {"fecha": timestamp, "motivo": str}}
+    y se consulta en memoria, así los destinatarios conocidos se omiten
+    antes de abrir el chat. Seguro para hilos.
+    """
+
+    def __init__(self, ruta: str = ARCHIVO_NUMEROS_INVALIDOS, dias_vigencia: float = DIAS_VIGENCIA):
+        self.ruta = ruta
+        self.vigencia = dias_vigencia * 24 * 3600
+        self._lock = threading.Lock()
+        self._datos: Dict[str, Dict] = {}
+        if os.path.exists(ruta):
+            try:
+                with open(ruta, "r", encoding="utf-8") as f:
+                    self._datos = json.load(f)
+            except (OSError, ValueError):
+                self._datos = {}
+        self._numeros = frozenset()
+        # Momento en que vence el número más antiguo (para purgar solo entonces)
+        self._proximo_vencimiento = float("inf")
+        self.purgar()
+
+    def __len__(self) -> int:
+        return len(self.numeros)
+
+    def __contains__(self, telefono: str) -> bool:
+        return self.contiene(telefono)
+
+    @property
+    def numeros(self) -> FrozenSet[str]:
+        """Vista en memoria de los números vigentes (no cambia al agregar)
+
+        Si alguno venció desde la última purga, se purga antes de retornarla.
+        """
+        if time.time() > self._proximo_vencimiento:
+            self.purgar()
+        return self._numeros
+
+    def contiene(self, telefono: str) -> bool:
+        datos = self._datos.get(telefono)
+        return datos is not None and not self._vencido(datos)
+
+    def motivo(self, telefono: str) -> Optional[str]:
+        datos = self._datos.get(telefono)
+        if datos is None or self._vencido(datos):
+            return None
+        return datos.get("motivo", MOTIVO_INVALIDO)
+
+    def agregar(self, telefono: str, motivo: str = MOTIVO_INVALIDO) -> None:
+        with self._lock:
+            fecha = time.time()
+            self._datos[telefono] = {"fecha": fecha, "motivo": motivo}
+            self._numeros = self._numeros | {telefono}
+            self._proximo_vencimiento = min(self._proximo_vencimiento, fecha + self.vigencia)
+            self._guardar()
+
+    def quitar(self, telefono: str) -> None:
+        with self._lock:
+            if self._datos.pop(telefono, None) is not None:
+                self._numeros = self._numeros - {telefono}
+                self._guardar()
+
+    def purgar(self) -> int:
+        """Elimina los números vencidos. Retorna cuántos se eliminaron"""
+        with self._lock:
+            vencidos = [tel for tel, datos in self._datos.items() if self._vencido(datos)]
+            for telefono in vencidos:
+                del self._datos[telefono]
+            self._numeros = frozenset(self._datos)
+            self._proximo_vencimiento = min(
+                (datos.get("fecha", 0) + self.vigencia for datos in self._datos.values()),
+                default=float("inf")
+            )
+            if vencidos:
+                self._guardar()
+            return len(vencidos)
+
+    def _vencido(self, datos: Dict) -> bool:
+        return time.time() - datos.get("fecha", 0) > self.vigencia
+
+    def _guardar(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self._datos, f, ensure_ascii=False)
+        os.replace(temporal, self.ruta)
@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence
+
+from .send_journal import RUTA_LOGS
+
+ARCHIVO_METRICAS = os.path.join(RUTA_LOGS, "metricas_envio.json")
+
+# Fases de cada envío, en el orden en que ocurren
+FASES = ("navegacion", "chat_listo", "escritura", "envio", "verificacion", "pausa")
+
+# Límites superiores (segundos) de los rangos del histograma
+LIMITES_HISTOGRAMA = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60)
+
+# Puerto del endpoint /metrics en formato Prometheus (None = desactivado)
+PUERTO_PROMETHEUS = None
+
+
+class TiemposEnvio:
+    """Duración de cada fase del envío a un destinatario"""
+
+    def __init__(self):
+        self.fases: Dict[str, float] = {}
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def fase(self, nombre: str):
+        """Mide el bloque y lo suma a la fase indicada (aunque falle)"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases[nombre] = self.fases.get(nombre, 0.0) + time.perf_counter() - inicio
+
+    def como_dict(self) -> Dict[str, float]:
+        """Tiempos en segundos por fase más el total, para el registro"""
+        tiempos = {nombre: round(segundos, 4) for nombre, segundos in self.fases.items()}
+        tiempos["total"] = round(time.perf_counter() - self._inicio, 4)
+        return tiempos
+
+
+class Histograma:
+    """Histograma acumulado con rangos fijos (como los de Prometheus)"""
+
+    def __init__(self, limites: Sequence[float] = LIMITES_HISTOGRAMA):
+        self.limites = tuple(limites)
+        self.conteos = [0] * len(self.limites)
+        self.cantidad = 0
+        self.suma = 0.0
+
+    def observar(self, valor: float) -> None:
+        self.cantidad += 1
+        self.suma += valor
+        for posicion, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.conteos[posicion] += 1
+
+    def como_dict(self) -> Dict:
+        return {
+            "cantidad": self.cantidad,
+            "suma": round(self.suma, 4),
+            "promedio": round(self.suma / self.cantidad, 4) if self.cantidad else 0.0,
+            "rangos": {str(limite): conteo for limite, conteo in zip(self.limites, self.conteos)},
+        }
+
+
+class MetricasEnvio:
+    """Agrega los tiempos de los registros de envío en histogramas por fase
+
+    Cada registro con la clave "tiempos" (ver TiemposEnvio) suma sus fases
+    y su total; también se cuentan los registros por estado. Seguro para hilos.
+    """
+
+    def __init__(self, ruta: str = ARCHIVO_METRICAS):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self.histogramas: Dict[str, Histograma] = {}
+        self.estados: Dict[str, int] = {}
+        self._servidor: Optional[ThreadingHTTPServer] = None
+
+    def registrar(self, registro: Dict) -> None:
+        with self._lock:
+            estado = registro.get("estado", "Desconocido")
+            self.estados[estado] = self.estados.get(estado, 0) + 1
+            for fase, segundos in registro.get("tiempos", {}).items():
+                if fase not in self.histogramas:
+                    self.histogramas[fase] = Histograma()
+                self.histogramas[fase].observar(segundos)
+
+    def como_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "actualizado": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "estados": dict(self.estados),
+                "fases": {fase: h.como_dict() for fase, h in self.histogramas.items()},
+            }
+
+    def exportar(self, ruta: Optional[str] = None) -> str:
+        """Escribe las métricas en JSON (reemplazo atómico) y retorna la ruta"""
+        ruta = ruta or self.ruta
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
+        return ruta
+
+    def texto_prometheus(self) -> str:
+        """Métricas en el formato de texto de Prometheus"""
+        lineas = [
+            "# HELP whatsapp_envio_fase_segundos Duración de cada fase del envío",
+            "# TYPE whatsapp_envio_fase_segundos histogram",
+        ]
+        with self._lock:
+            for fase, h in self.histogramas.items():
+                for limite, conteo in zip(h.limites, h.conteos):
+                    lineas.append(f'whatsapp_envio_fase_segundos_bucket{{fase="{fase}",le="{limite}"}} {conteo}')
+                lineas.append(f'whatsapp_envio_fase_segundos_bucket{{fase="{fase}",le="+Inf"}} {h.cantidad}')
+                lineas.append(f'whatsapp_envio_fase_segundos_sum{{fase="{fase}"}} {h.suma:.4f}')
+                lineas.append(f'whatsapp_envio_fase_segundos_count{{fase="{fase}"}} {h.cantidad}')
+            lineas.append("# HELP whatsapp_envios_total Registros de envío por estado")
+            lineas.append("# TYPE whatsapp_envios_total counter")
+            for estado, cantidad in self.estados.items():
+                lineas.append(f'whatsapp_envios_total{{estado="{estado}"}} {cantidad}')
+        return "\n".join(lineas) + "\n"
+
+    def iniciar_servidor(self, puerto: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Publica /metrics en un hilo aparte (formato Prometheus)"""
+        if self._servidor is not None:
+            return self._servidor
+        metricas = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                contenido = metricas.texto_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(contenido)))
+                self.end_headers()
+                self.wfile.write(contenido)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer((host, puerto), Manejador)
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self._servidor
+
+    def detener_servidor(self) -> None:
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Sequence
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+RUTA_CACHE = os.path.join(ROOT_PATH, "cache")
+ARCHIVO_SELECTORES = os.path.join(RUTA_CACHE, "selectores.json")
+
+# Cada cuántos aciertos se guarda el ranking aunque no cambie el primero
+GUARDAR_CADA = 20
+
+# Evalúa todas las estrategias en una sola llamada y retorna la primera
+# (según el ranking) que encuentra un elemento visible: [índice, elemento]
+SCRIPT_PRIMER_SELECTOR = """
+const xpaths = arguments[0];
+const soloVisibles = arguments[1];
+for (let i = 0; i < xpaths.length; i++) {
+    let nodo = null;
+    try {
+        nodo = document.evaluate(xpaths[i], document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (e) {
+        continue;
+    }
+    if (!nodo) continue;
+    if (soloVisibles) {
+        const r = nodo.getBoundingClientRect();
+        if (r.width === 0 || r.height === 0 || nodo.disabled) continue;
+    }
+    return [i, nodo];
+}
+return null;
+"""
+
+
+class RegistroSelectores:
+    """Ranking persistente de las estrategias XPath de cada elemento de la UI
+
+    Recuerda qué estrategia encontró cada elemento, la prueba primero la
+    próxima vez y guarda el ranking en disco entre ejecuciones.
+    """
+
+    def __init__(self, ruta: str = ARCHIVO_SELECTORES):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._sin_guardar = 0
+        # {elemento: {xpath: {"exitos": n, "ultimo": timestamp}}}
+        self._datos: Dict[str, Dict[str, Dict]] = {}
+        if os.path.exists(ruta):
+            try:
+                with open(ruta, "r", encoding="utf-8") as f:
+                    self._datos = json.load(f)
+            except (OSError, ValueError):
+                self._datos = {}
+
+    def ordenar(self, elemento: str, estrategias: Sequence[str]) -> List[str]:
+        """Estrategias ordenadas por aciertos (y el orden original al empatar)"""
+        estadisticas = self._datos.get(elemento, {})
+
+        def clave(par):
+            posicion, xpath = par
+            datos = estadisticas.get(xpath, {})
+            return (-datos.get("exitos", 0), -datos.get("ultimo", 0), posicion)
+
+        return [xpath for _, xpath in sorted(enumerate(estrategias), key=clave)]
+
+    def registrar_exito(self, elemento: str, xpath: str, estrategias: Sequence[str]) -> None:
+        """Suma un acierto y guarda si cambió la estrategia preferida"""
+        with self._lock:
+            primera_antes = self.ordenar(elemento, estrategias)[0]
+            datos = self._datos.setdefault(elemento, {}).setdefault(xpath, {"exitos": 0})
+            datos["exitos"] += 1
+            datos["ultimo"] = time.time()
+            self._sin_guardar += 1
+            if xpath != primera_antes or self._sin_guardar >= GUARDAR_CADA:
+                self._guardar()
+
+    def consultar(self, driver, elemento: str, estrategias: Sequence[str],
+                  solo_visibles: bool = True):
+        """Una sola consulta (sin esperar): el elemento o None si no está"""
+        orden = self.ordenar(elemento, estrategias)
+        encontrado = driver.execute_script(SCRIPT_PRIMER_SELECTOR, orden, solo_visibles)
+        if not encontrado:
+            return None
+        indice, nodo = encontrado
+        self.registrar_exito(elemento, orden[indice], estrategias)
+        return nodo
+
+    def buscar(self, driver, elemento: str, estrategias: Sequence[str],
+               timeout: float, solo_visibles: bool = True, intervalo: float = 0.1):
+        """Busca el elemento probando todas las estrategias en cada consulta
+
+        Lanza TimeoutException si ninguna encuentra el elemento a tiempo.
+        """
+        orden = self.ordenar(elemento, estrategias)
+        indice, nodo = WebDriverWait(driver, timeout, poll_frequency=intervalo).until(
+            lambda d: d.execute_script(SCRIPT_PRIMER_SELECTOR, orden, solo_visibles)
+        )
+        self.registrar_exito(elemento, orden[indice], estrategias)
+        return nodo
+
+    def guardar(self) -> None:
+        with self._lock:
+            self._guardar()
+
+    def _guardar(self) -> None:
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self._datos, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, self.ruta)
+        self._sin_guardar = 0
+
+
+# Registro compartido por todas las sesiones del proceso
+REGISTRO_SELECTORES = RegistroSelectores()
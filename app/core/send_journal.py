@@ -0,0 +1,176 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+RUTA_LOGS = os.path.join(ROOT_PATH, "logs")
+ARCHIVO_DIARIO = os.path.join(RUTA_LOGS, "registro_envios.jsonl")
+
+# Sincronización con el disco (fsync) cada N registros o cada T segundos
+REGISTROS_POR_SYNC = 50
+SEGUNDOS_POR_SYNC = 2.0
+
+# Rotación: tamaño máximo del archivo activo y copias antiguas que se conservan
+TAMANO_MAXIMO = 50 * 1024 * 1024
+COPIAS_ROTADAS = 5
+
+ENCABEZADO_REPORTE = "FECHA | TELÉFONO | ESTADO | DETALLE\n"
+
+
+class DiarioEnvios:
+    """Diario de envíos en formato JSONL, solo de escritura al final
+
+    Cada resultado se agrega apenas termina, así un cierre inesperado no
+    pierde lo ya enviado. Las líneas pasan al sistema operativo en cada
+    registro y se sincronizan con el disco por lotes. Seguro para hilos.
+    """
+
+    def __init__(
+        self,
+        ruta: str = ARCHIVO_DIARIO,
+        registros_por_sync: int = REGISTROS_POR_SYNC,
+        segundos_por_sync: float = SEGUNDOS_POR_SYNC,
+        tamano_maximo: int = TAMANO_MAXIMO,
+        copias: int = COPIAS_ROTADAS
+    ):
+        self.ruta = ruta
+        self.registros_por_sync = registros_por_sync
+        self.segundos_por_sync = segundos_por_sync
+        self.tamano_maximo = tamano_maximo
+        self.copias = copias
+        self._lock = threading.Lock()
+        self._pendientes = 0
+        self._ultimo_sync = time.monotonic()
+        self._rotaciones = 0
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self._archivo = open(ruta, "a", encoding="utf-8")
+
+    def registrar(self, registro: Dict) -> None:
+        """Agrega un resultado al diario"""
+        linea = json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._archivo.write(linea)
+            self._archivo.flush()
+            self._pendientes += 1
+            if (self._pendientes >= self.registros_por_sync or
+                    time.monotonic() - self._ultimo_sync >= self.segundos_por_sync):
+                self._sincronizar()
+            if self.tamano_maximo and self._archivo.tell() >= self.tamano_maximo:
+                self._rotar()
+
+    def marca(self) -> Tuple[int, int]:
+        """Posición actual del diario: (rotaciones, bytes del archivo activo)"""
+        with self._lock:
+            return self._rotaciones, self._archivo.tell()
+
+    def desde(self, marca: Tuple[int, int]) -> Tuple[int, int]:
+        """Traduce una marca al argumento `desde` de leer_diario:
+        (rotaciones ocurridas después de la marca, bytes)"""
+        with self._lock:
+            return self._rotaciones - marca[0], marca[1]
+
+    def sincronizar(self) -> None:
+        """Fuerza la escritura en disco de los registros pendientes"""
+        with self._lock:
+            self._sincronizar()
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if not self._archivo.closed:
+                self._sincronizar()
+                self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+    def _sincronizar(self) -> None:
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._pendientes = 0
+        self._ultimo_sync = time.monotonic()
+
+    def _rotar(self) -> None:
+        """registro.jsonl -> registro.jsonl.1 -> ... -> registro.jsonl.N"""
+        self._sincronizar()
+        self._archivo.close()
+        antiguo = f"{self.ruta}.{self.copias}"
+        if os.path.exists(antiguo):
+            os.remove(antiguo)
+        for numero in range(self.copias - 1, 0, -1):
+            origen = f"{self.ruta}.{numero}"
+            if os.path.exists(origen):
+                os.replace(origen, f"{self.ruta}.{numero + 1}")
+        os.replace(self.ruta, f"{self.ruta}.1")
+        self._archivo = open(self.ruta, "a", encoding="utf-8")
+        self._rotaciones += 1
+
+
+def leer_diario(
+    ruta: str = ARCHIVO_DIARIO,
+    incluir_rotados: bool = True,
+    desde: Optional[Tuple[int, int]] = None
+) -> Iterator[Dict]:
+    """Recorre los registros del diario del más antiguo al más reciente
+
+    Con `desde` (ver DiarioEnvios.desde) solo se leen los registros escritos
+    después de una marca, sin abrir las copias rotadas anteriores a ella.
+    Las líneas incompletas (por ejemplo, tras un corte de luz) se ignoran.
+    """
+    archivos = []
+    if incluir_rotados:
+        numero = 1
+        while os.path.exists(f"{ruta}.{numero}"):
+            if desde is not None and numero > desde[0]:
+                break
+            archivos.insert(0, f"{ruta}.{numero}")
+            numero += 1
+    if os.path.exists(ruta):
+        archivos.append(ruta)
+
+    # El archivo que estaba activo al tomar la marca se lee desde su posición
+    # (si ya fue descartado por la rotación, se lee lo que quede)
+    desplazamiento = 0
+    if desde is not None and (desde[0] == 0 or f"{ruta}.{desde[0]}" in archivos):
+        desplazamiento = desde[1]
+
+    for numero, archivo in enumerate(archivos):
+        with open(archivo, "r", encoding="utf-8") as f:
+            if numero == 0 and desplazamiento:
+                f.seek(desplazamiento)
+            for linea in f:
+                if not linea.strip():
+                    continue
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError:
+                    continue
+
+
+def generar_reporte(
+    ruta_reporte: str,
+    ruta_diario: str = ARCHIVO_DIARIO,
+    filtro: Optional[Callable[[Dict], bool]] = None,
+    separador: str = "-----------------------------------\n",
+    desde: Optional[Tuple[int, int]] = None
+) -> int:
+    """Genera el reporte de texto "FECHA | TELÉFONO | ESTADO | DETALLE" a
+    partir del diario (desde la marca `desde`, si se indica). Retorna la
+    cantidad de registros escritos."""
+    temporal = f"{ruta_reporte}.tmp"
+    escritos = 0
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(ENCABEZADO_REPORTE)
+        f.write(separador)
+        for r in leer_diario(ruta_diario, desde=desde):
+            if filtro is not None and not filtro(r):
+                continue
+            f.write(f"{r['fecha']} | {r['telefono']} | {r['estado']} | {r['detalle']}\n")
+            escritos += 1
+    # Reemplazo atómico: el reporte anterior nunca queda a medio escribir
+    os.replace(temporal, ruta_reporte)
+    return escritos
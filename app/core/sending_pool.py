@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .browser_profiles import PERFIL_PREDETERMINADO
+from .invalid_numbers import CacheNumerosInvalidos, MOTIVO_INVALIDO
+from .whatsapp_bot import configurar_navegador, esperar_inicio_sesion, enviar_mensaje
+
+# Envíos seguidos con estado "Error" tras los que una sesión se da por caída
+# (navegador cerrado, sesión expirada) y deja sus pendientes a las demás
+MAX_ERRORES_SEGUIDOS = 3
+
+
+def cuentas_predeterminadas(sesiones: int) -> List[str]:
+    """Nombres de perfil para N sesiones: 'principal', 'cuenta_2', ..."""
+    return [PERFIL_PREDETERMINADO] + [f"cuenta_{i}" for i in range(2, sesiones + 1)]
+
+
+def _registro_sin_envio(telefono: str, estado: str, detalle: str) -> Dict:
+    return {
+        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "telefono": telefono,
+        "estado": estado,
+        "detalle": detalle,
+        "confirmado": False
+    }
+
+
+class PoolEnvio:
+    """Envía mensajes de WhatsApp con varias sesiones de Chrome en paralelo
+
+    Cada sesión usa su propio perfil persistente (una cuenta de WhatsApp) y
+    un hilo propio. Los destinatarios se toman de una cola compartida: si
+    una sesión no inicia sesión o se cae, las demás siguen con lo que quedó
+    pendiente. Los resultados se devuelven en el orden original.
+    Con `numeros_invalidos` (CacheNumerosInvalidos) los números que WhatsApp
+    ya reportó como inválidos se omiten sin abrir el chat. Con `ligero` cada
+    sesión corre sin ventana y sin imágenes (ver configurar_navegador).
+    """
+
+    def __init__(
+        self,
+        cuentas: Sequence[str],
+        cuota_por_sesion: Optional[int] = None,
+        numeros_invalidos: Optional[CacheNumerosInvalidos] = None,
+        ligero: bool = False
+    ):
+        if not cuentas:
+            raise ValueError("Debe indicar al menos una cuenta")
+        self.cuentas = list(cuentas)
+        self.cuota_por_sesion = cuota_por_sesion
+        self.numeros_invalidos = numeros_invalidos
+        self.ligero = ligero
+        self._lock = threading.Lock()
+
+    def enviar(
+        self,
+        envios: Sequence[Tuple[str, str]],
+        al_registrar: Optional[Callable[[int, Dict], None]] = None,
+        control=None
+    ) -> List[Dict]:
+        """Envía la lista de (telefono, mensaje) y retorna los registros
+
+        al_registrar(indice, registro) se llama cada vez que termina un envío.
+        control (ControlCampana) permite pausar o cancelar entre mensajes.
+        """
+        registros: List[Optional[Dict]] = [None] * len(envios)
+
+        # Los números inválidos conocidos no ocupan cupo en las sesiones
+        conocidos = self.numeros_invalidos.numeros if self.numeros_invalidos is not None else frozenset()
+        activos = [i for i, (telefono, _) in enumerate(envios) if telefono not in conocidos]
+        invalidos = [i for i, (telefono, _) in enumerate(envios) if telefono in conocidos]
+
+        # Cola compartida: cada sesión toma el siguiente destinatario pendiente
+        pendientes = deque(activos)
+
+        def tomar() -> Optional[int]:
+            with self._lock:
+                return pendientes.popleft() if pendientes else None
+
+        def guardar(indice: int, registro: Dict) -> None:
+            with self._lock:
+                registros[indice] = registro
+                if al_registrar:
+                    al_registrar(indice, registro)
+
+        for indice in invalidos:
+            telefono = envios[indice][0]
+            guardar(indice, _registro_sin_envio(
+                telefono, "Omitido", self.numeros_invalidos.motivo(telefono) or MOTIVO_INVALIDO
+            ))
+
+        finales: List[Tuple[str, str]] = []
+        if pendientes:
+            sesiones = self.cuentas[:len(pendientes)]
+            with ThreadPoolExecutor(max_workers=len(sesiones)) as executor:
+                futuros = [
+                    executor.submit(self._trabajar, cuenta, tomar, envios, guardar, control)
+                    for cuenta in sesiones
+                ]
+                finales = [futuro.result() for futuro in futuros]
+
+        # Lo que ninguna sesión alcanzó a enviar
+        if control is not None and control.cancelada:
+            estado, detalle = "Cancelado", "Campaña cancelada por el usuario"
+        elif any(motivo == "cuota" for motivo, _ in finales):
+            estado, detalle = "Omitido", "Cuota de las sesiones agotada"
+        else:
+            errores = [detalle for motivo, detalle in finales if motivo == "error"]
+            estado = "Error"
+            detalle = "Ninguna sesión disponible: " + (errores[-1] if errores else "sin sesiones")
+        for indice in pendientes:
+            guardar(indice, _registro_sin_envio(envios[indice][0], estado, detalle))
+
+        return registros
+
+    def _trabajar(self, cuenta, tomar, envios, guardar, control=None) -> Tuple[str, str]:
+        """Envía desde una sesión tomando destinatarios de la cola compartida
+
+        Retorna (motivo, detalle) de por qué se detuvo: "fin" (cola vacía),
+        "cuota", "cancelada" o "error".
+        """
+        driver = None
+        indice = None
+        enviados = 0
+        errores_seguidos = 0
+        try:
+            # No abrir el navegador si la campaña ya fue cancelada
+            if control is not None and control.cancelada:
+                return "cancelada", ""
+            driver = configurar_navegador(perfil=cuenta, ligero=self.ligero)
+            if not esperar_inicio_sesion(driver):
+                raise RuntimeError(f"No se pudo iniciar sesión con la cuenta '{cuenta}'")
+
+            while True:
+                if self.cuota_por_sesion is not None and enviados >= self.cuota_por_sesion:
+                    return "cuota", ""
+                inicio_pausa = time.perf_counter()
+                if control is not None and not control.esperar_turno():
+                    return "cancelada", ""
+                pausa = time.perf_counter() - inicio_pausa
+                indice = tomar()
+                if indice is None:
+                    return "fin", ""
+
+                telefono, mensaje = envios[indice]
+                registro = enviar_mensaje(
+                    driver, telefono, mensaje, numeros_invalidos=self.numeros_invalidos
+                )
+                registro["cuenta"] = cuenta
+                # Tiempo que la sesión esperó a que se reanudara la campaña
+                registro.setdefault("tiempos", {})["pausa"] = round(pausa, 4)
+                guardar(indice, registro)
+                indice = None
+                enviados += 1
+
+                errores_seguidos = errores_seguidos + 1 if registro["estado"] == "Error" else 0
+                if errores_seguidos >= MAX_ERRORES_SEGUIDOS:
+                    raise RuntimeError(f"{errores_seguidos} envíos seguidos con error")
+        except Exception as e:
+            print(f"❌ Sesión '{cuenta}' detenida: {str(e)}")
+            # El destinatario en curso queda como error; el resto de la cola
+            # lo envían las demás sesiones
+            if indice is not None:
+                registro = _registro_sin_envio(envios[indice][0], "Error", str(e))
+                registro["cuenta"] = cuenta
+                guardar(indice, registro)
+            return "error", str(e)
+        finally:
+            if driver is not None:
+                driver.quit()
@@ -1,64 +1,247 @@
 import os
-import requests
+import asyncio
+import random
+import aiohttp
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
+from .send_journal import DiarioEnvios, generar_reporte
+
+# Conexiones HTTP reutilizables (keep-alive) y solicitudes simultáneas. Más
+# solicitudes que conexiones solo harían esperar turno en el pool
+CONEXIONES_MAXIMAS = 20
+CONCURRENCIA_MAXIMA = CONEXIONES_MAXIMAS
+
+# Mensajes por solicitud si el proveedor acepta lotes (1 = uno por solicitud)
+TAMANO_LOTE = 1
+
+# Reintentos con espera exponencial y jitter completo
+REINTENTOS = 4
+ESPERA_BASE = 0.5
+ESPERA_MAXIMA = 8.0
+
+# Tiempos máximos (segundos) para conectar y para cada lectura de la
+# respuesta; la espera por una conexión libre del pool no cuenta
+TIMEOUT_CONEXION = 10
+TIMEOUT_SOLICITUD = 15
+
+# El envío no es idempotente: solo se reintentan las respuestas que indican
+# que la pasarela no procesó la solicitud. Un 5xx o un corte después de
+# enviarla puede llegar con el SMS ya aceptado y queda como "Sin confirmar"
+ESTADOS_REINTENTABLES = {429, 503}
+
+# Fallas antes de que la solicitud saliera (no se pudo conectar)
+ERRORES_SIN_ENVIO = tuple(
+    error for error in (
+        aiohttp.ClientConnectorError,
+        getattr(aiohttp, "ConnectionTimeoutError", None)  # aiohttp >= 3.10
+    ) if error is not None
+)
+
+
+def _registro(phone: str, estado: str, detalle: str, confirmado: bool) -> Dict:
+    return {
+        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "telefono": phone,
+        "estado": estado,
+        "detalle": detalle,
+        "confirmado": confirmado
+    }
+
+
+def espera_reintento(intento: int, base: float = ESPERA_BASE, maxima: float = ESPERA_MAXIMA) -> float:
+    """Espera antes del reintento N: aleatoria entre 0 y base * 2^N (con tope)"""
+    return random.uniform(0, min(maxima, base * 2 ** intento))
+
+
+class ErrorReintentable(Exception):
+    """Falla temporal del proveedor (saturado, caído o sin conexión)"""
+
+    def __init__(self, detalle: str, espera: Optional[float] = None):
+        super().__init__(detalle)
+        self.espera = espera
+
 
 class SMSService:
+    """Envío de SMS a través de una pasarela HTTP
+
+    Sin `api_url` el envío se simula. Con `api_url` los mensajes se envían
+    con asyncio sobre una sola sesión HTTP (conexiones keep-alive), con un
+    límite de solicitudes simultáneas, lotes si el proveedor los acepta
+    (`batch_size` > 1) y reintentos con espera exponencial y jitter. Solo se
+    reintenta lo que con seguridad no se envió (ver ESTADOS_REINTENTABLES),
+    para no repetir un SMS al mismo destinatario.
+
+    Contrato de la pasarela (JSON, autenticación Bearer):
+      - Individual: {"to", "message"} -> {"id", "status"}
+      - Lote: {"messages": [{"to", "message"}, ...]} ->
+        {"results": [{"to", "status", "id" | "error"}, ...]} en el mismo orden
+    """
+
     def __init__(self):
         self.root_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
         self.logs_path = os.path.join(self.root_path, "logs")
         self.sms_log = os.path.join(self.logs_path, "sms_envios.txt")
+        self.sms_journal = os.path.join(self.logs_path, "sms_envios.jsonl")
         self.api_key = None
+        self.api_url = None
+        self.batch_size = TAMANO_LOTE
+        self.max_connections = CONEXIONES_MAXIMAS
+        self.max_concurrency = CONCURRENCIA_MAXIMA
+        self.retries = REINTENTOS
         self.configured = False
 
-    def configure(self, api_key: str) -> bool:
-        """Configura el servicio SMS con una API key"""
+    def configure(
+        self,
+        api_key: str,
+        api_url: Optional[str] = None,
+        batch_size: int = TAMANO_LOTE,
+        max_connections: int = CONEXIONES_MAXIMAS,
+        max_concurrency: int = CONCURRENCIA_MAXIMA,
+        retries: int = REINTENTOS
+    ) -> bool:
+        """Configura el servicio SMS con una API key y la URL de la pasarela"""
+        if batch_size < 1 or max_connections < 1 or max_concurrency < 1:
+            raise ValueError("Los límites de envío deben ser mayores que cero")
         self.api_key = api_key
+        self.api_url = api_url
+        self.batch_size = batch_size
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.retries = retries
         self.configured = True
         return True
 
     def send_message(self, phone: str, message: str) -> Dict:
         """Envía un mensaje SMS y retorna el resultado"""
+        return self.send_messages([(phone, message)])[0]
+
+    def send_messages(self, envios: Sequence[Tuple[str, str]]) -> List[Dict]:
+        """Envía la lista de (telefono, mensaje) y retorna los registros en
+        el mismo orden. Bloquea hasta terminar; no llamar desde un event loop."""
+        return asyncio.run(self.send_messages_async(envios))
+
+    async def send_messages_async(self, envios: Sequence[Tuple[str, str]]) -> List[Dict]:
+        """Versión asíncrona de send_messages"""
         if not self.configured:
-            return {
-                "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "telefono": phone,
-                "estado": "Error",
-                "detalle": "Servicio SMS no configurado",
-                "confirmado": False
-            }
+            return [
+                _registro(phone, "Error", "Servicio SMS no configurado", False)
+                for phone, _ in envios
+            ]
 
-        try:
+        if not self.api_url:
             # Aquí iría la lógica de envío real usando una API de SMS
-            # Por ahora simulamos el envío
-            print(f"📤 Simulando envío SMS a {phone}: {message}")
-            
-            registro = {
-                "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "telefono": phone,
-                "estado": "Éxito",
-                "detalle": "SMS enviado correctamente",
-                "confirmado": True
-            }
-            
-            return registro
-            
-        except Exception as e:
-            return {
-                "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "telefono": phone,
-                "estado": "Error",
-                "detalle": str(e),
-                "confirmado": False
-            }
+            # Sin pasarela configurada simulamos el envío
+            registros = []
+            for phone, message in envios:
+                print(f"📤 Simulando envío SMS a {phone}: {message}")
+                registros.append(_registro(phone, "Éxito", "SMS enviado correctamente", True))
+            return registros
+
+        lotes = [
+            list(range(inicio, min(inicio + self.batch_size, len(envios))))
+            for inicio in range(0, len(envios), self.batch_size)
+        ]
+        registros: List[Optional[Dict]] = [None] * len(envios)
+        limite = asyncio.Semaphore(min(self.max_concurrency, self.max_connections))
+        conector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=TIMEOUT_CONEXION, sock_read=TIMEOUT_SOLICITUD
+        )
+        encabezados = {"Authorization": f"Bearer {self.api_key}"}
+
+        async with aiohttp.ClientSession(
+            connector=conector, timeout=timeout, headers=encabezados
+        ) as sesion:
+            async def enviar_lote(indices: List[int]) -> None:
+                async with limite:
+                    resultados = await self._enviar_con_reintentos(
+                        sesion, [envios[i] for i in indices]
+                    )
+                for indice, registro in zip(indices, resultados):
+                    registros[indice] = registro
+
+            await asyncio.gather(*(enviar_lote(lote) for lote in lotes))
+
+        return registros
+
+    async def _enviar_con_reintentos(
+        self, sesion: "aiohttp.ClientSession", lote: List[Tuple[str, str]]
+    ) -> List[Dict]:
+        """Envía un lote reintentando las fallas temporales"""
+        for intento in range(self.retries + 1):
+            try:
+                return await self._enviar_lote(sesion, lote)
+            except ErrorReintentable as e:
+                if intento == self.retries:
+                    detalle = f"{str(e)} (tras {self.retries + 1} intentos)"
+                    return [_registro(phone, "Error", detalle, False) for phone, _ in lote]
+                espera = espera_reintento(intento)
+                if e.espera is not None:
+                    espera = max(espera, e.espera)
+                await asyncio.sleep(espera)
+            except Exception as e:
+                return [_registro(phone, "Error", str(e), False) for phone, _ in lote]
+
+    async def _enviar_lote(
+        self, sesion: "aiohttp.ClientSession", lote: List[Tuple[str, str]]
+    ) -> List[Dict]:
+        """Una solicitud a la pasarela; lanza ErrorReintentable si es temporal
+        y la pasarela no alcanzó a procesarla"""
+        if self.batch_size > 1:
+            cuerpo = {"messages": [{"to": phone, "message": message} for phone, message in lote]}
+        else:
+            phone, message = lote[0]
+            cuerpo = {"to": phone, "message": message}
+
+        try:
+            async with sesion.post(self.api_url, json=cuerpo) as respuesta:
+                if respuesta.status in ESTADOS_REINTENTABLES:
+                    espera = respuesta.headers.get("Retry-After")
+                    raise ErrorReintentable(
+                        f"HTTP {respuesta.status}",
+                        float(espera) if espera and espera.isdigit() else None
+                    )
+                if respuesta.status >= 500:
+                    detalle = f"HTTP {respuesta.status} (el SMS pudo haberse aceptado)"
+                    return [_registro(phone, "Sin confirmar", detalle, False) for phone, _ in lote]
+                if respuesta.status >= 400:
+                    detalle = f"HTTP {respuesta.status}: {(await respuesta.text())[:200]}"
+                    return [_registro(phone, "Error", detalle, False) for phone, _ in lote]
+                try:
+                    # Sin exigir el Content-Type: algunas pasarelas responden JSON como texto
+                    datos = await respuesta.json(content_type=None)
+                except ValueError:
+                    datos = None
+                if not isinstance(datos, dict):
+                    # La pasarela aceptó la solicitud (2xx): el SMS pudo haber salido
+                    detalle = f"HTTP {respuesta.status} con respuesta ilegible de la pasarela"
+                    return [_registro(phone, "Sin confirmar", detalle, False) for phone, _ in lote]
+        except ERRORES_SIN_ENVIO as e:
+            raise ErrorReintentable(str(e) or type(e).__name__)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            # La solicitud ya salió: el SMS pudo haberse aceptado
+            detalle = f"Sin respuesta de la pasarela: {str(e) or type(e).__name__}"
+            return [_registro(phone, "Sin confirmar", detalle, False) for phone, _ in lote]
+
+        resultados = datos.get("results", []) if self.batch_size > 1 else [datos]
+        registros = []
+        for posicion, (phone, _) in enumerate(lote):
+            resultado = resultados[posicion] if posicion < len(resultados) else {}
+            if resultado.get("status") in ("accepted", "queued", "sent", "delivered"):
+                detalle = f"SMS enviado correctamente (id {resultado.get('id', '-')})"
+                registros.append(_registro(phone, "Éxito", detalle, True))
+            else:
+                detalle = resultado.get("error") or "Respuesta de la pasarela sin estado"
+                registros.append(_registro(phone, "Fallo", detalle, False))
+        return registros
 
     def guardar_registro(self, registros: List[Dict]) -> None:
-        """Guarda el registro de envíos SMS"""
-        with open(self.sms_log, "w", encoding="utf-8") as f:
-            f.write("FECHA | TELÉFONO | ESTADO | DETALLE\n")
-            f.write("-" * 80 + "\n")
+        """Agrega los envíos SMS al diario y regenera el reporte de texto
+        con ellos (no con todo el historial del diario)"""
+        with DiarioEnvios(self.sms_journal) as diario:
+            marca = diario.marca()
             for r in registros:
-                f.write(
-                    f"{r['fecha']} | {r['telefono']} | {r['estado']} | "
-                    f"{r['detalle']}\n"
-                )
\ No newline at end of file
+                diario.registrar(r)
+        generar_reporte(
+            self.sms_log, self.sms_journal, separador="-" * 80 + "\n", desde=diario.desde(marca)
+        )
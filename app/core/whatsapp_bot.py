@@ -1,17 +1,28 @@
-import pandas as pd
+import os
 import time
+import weakref
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import (
+    ElementClickInterceptedException, NoSuchElementException, TimeoutException
+)
 from datetime import datetime
+from .browser_profiles import PERFIL_PREDETERMINADO, ruta_perfil, perfil_en_uso
+from .send_journal import ARCHIVO_DIARIO, DiarioEnvios, generar_reporte
+from .selector_cache import REGISTRO_SELECTORES
+from .invalid_numbers import MOTIVO_INVALIDO, CacheNumerosInvalidos
+from .metrics import MetricasEnvio, TiemposEnvio, PUERTO_PROMETHEUS
+from .dependencies import verificar_dependencias
 
 # Configuración de constantes
+URL_WHATSAPP = "https://web.whatsapp.com/"
 ARCHIVO_EXCEL = "clientes.xlsx"
 ARCHIVO_ERRORES = "registro_envios.txt"
 MENSAJE_BASE = """
@@ -21,15 +32,316 @@ Pague con su cédula: {cedula}.
 ¡Gracias!
 """
 
-def configurar_navegador():
-    """Configura y devuelve una instancia de Chrome WebDriver"""
+# Modo ligero: Chrome sin ventana y sin descargar imágenes, video ni fuentes.
+# Reduce la memoria por sesión para correr más cuentas en un mismo equipo.
+OPCIONES_MODO_LIGERO = [
+    '--headless=new',
+    '--window-size=1280,800',
+    '--renderer-process-limit=2',
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--blink-settings=imagesEnabled=false',
+    '--mute-audio',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+]
+
+# Recursos que el modo ligero bloquea por CDP antes de descargarlos
+URLS_BLOQUEADAS_MODO_LIGERO = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.ogg', '*.mp3', '*.opus',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+]
+
+# Cómo se abre el chat de cada destinatario: "interna" lo abre dentro de la
+# aplicación ya cargada (un clic en un enlace de WhatsApp, sin recargar) y
+# "recarga" navega a /send?phone= recargando WhatsApp Web completo
+MODO_NAVEGACION = "interna"
+
+# Fallas seguidas de la navegación interna tras las cuales una sesión pasa
+# a recargar la página para el resto de la campaña
+MAX_FALLOS_NAVEGACION_INTERNA = 3
+
+# Identidad del chat abierto: título del encabezado y URL. El título de la
+# pestaña no sirve (cambia con los mensajes sin leer)
+JS_IDENTIDAD_CHAT = """
+const identidadChat = (main) => {
+    const titulo = main.querySelector(
+        'header [data-testid="conversation-info-header-chat-title"], header span[title]'
+    ) || main.querySelector('header');
+    const texto = titulo ? (titulo.getAttribute('title') || titulo.textContent) : '';
+    return texto.trim() + '|' + location.href;
+};
+"""
+
+# Abre el chat con un clic en un enlace api.whatsapp.com dentro de la app.
+# WhatsApp intercepta esos enlaces y cambia de chat sin recargar; si nadie
+# lo intercepta se cancela la navegación y se retorna 'no_interceptado'.
+# El chat anterior queda marcado con su identidad (ver SCRIPT_CHAT_CAMBIADO).
+SCRIPT_ABRIR_CHAT_INTERNO = JS_IDENTIDAD_CHAT + """
+if (!document.querySelector('#pane-side')) return 'sin_app';
+const anterior = document.querySelector('#main');
+if (anterior) anterior.setAttribute('data-chat-anterior', identidadChat(anterior));
+const enlace = document.createElement('a');
+enlace.href = 'https://api.whatsapp.com/send?phone=' + arguments[0].replace(/\\D/g, '');
+let interceptado = false;
+const vigilar = (evento) => {
+    if (evento.target !== enlace) return;
+    interceptado = evento.defaultPrevented;
+    evento.preventDefault();
+};
+window.addEventListener('click', vigilar);
+(document.querySelector('#app') || document.body).appendChild(enlace);
+enlace.click();
+window.removeEventListener('click', vigilar);
+enlace.remove();
+return interceptado ? 'abierto' : 'no_interceptado';
+"""
+
+# El chat nuevo ya reemplazó al anterior (o apareció el aviso de número
+# inválido): #main es otro nodo o, si WhatsApp reutilizó el mismo, cambió
+# la identidad del chat; en ese caso se quita la marca
+SCRIPT_CHAT_CAMBIADO = JS_IDENTIDAD_CHAT + """
+const textoInvalido = /Phone number shared via url is invalid|dirección URL no es válido/;
+for (const d of document.querySelectorAll('[role="dialog"], [data-animate-modal-popup="true"]')) {
+    if (textoInvalido.test(d.textContent)) return true;
+}
+const main = document.querySelector('#main');
+if (!main) return false;
+if (!main.hasAttribute('data-chat-anterior')) return true;
+if (main.getAttribute('data-chat-anterior') !== identidadChat(main)) {
+    main.removeAttribute('data-chat-anterior');
+    return true;
+}
+return false;
+"""
+
+# Cierra el aviso de número inválido para que no bloquee el siguiente chat
+SCRIPT_CERRAR_AVISO_INVALIDO = """
+const textoInvalido = /Phone number shared via url is invalid|dirección URL no es válido/;
+for (const d of document.querySelectorAll('[role="dialog"], [data-animate-modal-popup="true"]')) {
+    if (!textoInvalido.test(d.textContent)) continue;
+    const boton = d.querySelector('button, [role="button"]');
+    if (boton) boton.click();
+}
+"""
+
+# Sesiones (drivers) en las que la navegación interna falló seguidas veces
+_FALLOS_NAVEGACION = weakref.WeakKeyDictionary()
+
+# Modo de escritura del mensaje: "pegar" (una sola llamada) o "caracter"
+MODO_ESCRITURA = "pegar"
+
+# Vacía el campo de texto (un borrador anterior) seleccionando su contenido
+# y borrándolo como lo haría el usuario, así el editor de WhatsApp se entera
+SCRIPT_VACIAR_CAMPO = """
+const campo = arguments[0];
+campo.focus();
+if (campo.textContent.length) {
+    const rango = document.createRange();
+    rango.selectNodeContents(campo);
+    const seleccion = window.getSelection();
+    seleccion.removeAllRanges();
+    seleccion.addRange(rango);
+    document.execCommand('delete', false);
+}
+"""
+
+# Simula un pegado (Ctrl+V) con el texto completo en el campo vacío;
+# WhatsApp conserva los saltos de línea y puede procesarlo en diferido
+SCRIPT_PEGAR_TEXTO = SCRIPT_VACIAR_CAMPO + """
+const datos = new DataTransfer();
+datos.setData('text/plain', arguments[1]);
+campo.dispatchEvent(new ClipboardEvent('paste', {
+    clipboardData: datos, bubbles: true, cancelable: true
+}));
+"""
+
+# Respaldo si el pegado no fue aceptado: insertar el texto como si se tecleara
+SCRIPT_INSERTAR_TEXTO = SCRIPT_VACIAR_CAMPO + """
+document.execCommand('insertText', false, arguments[1]);
+"""
+
+# El campo muestra exactamente el mensaje (sin importar cómo se partieron las
+# líneas en párrafos)
+SCRIPT_CAMPO_CON_MENSAJE = """
+const normalizar = (texto) => texto.replace(/\\s+/g, ' ').trim();
+return normalizar(arguments[0].innerText) === normalizar(arguments[1]);
+"""
+
+# Tiempos máximos (segundos) de cada espera por condición. Las esperas
+# terminan apenas WhatsApp Web está listo; estos valores solo son el tope.
+TIEMPOS_ESPERA = {
+    "pagina": 10,             # document.readyState == "complete"
+    "interfaz": 30,           # lista de chats visible tras iniciar sesión
+    "chat": 15,               # campo de texto del chat disponible
+    "chat_interno": 3,        # cambio de chat sin recargar (luego se recarga)
+    "foco": 2,                # campo de texto activo tras el clic
+    "texto": 5,               # mensaje visible en el campo de texto
+    "pegado": 1,              # el campo muestra el mensaje pegado
+    "envio": 10,              # burbuja saliente nueva y campo de texto vacío
+    "boton": 2,               # botón de enviar (si no aparece se usa Enter)
+    "ventana_emergente": 6,   # aparición/cierre de ventanas emergentes
+}
+
+# Pausa opcional entre destinatarios (0 = siguiente mensaje apenas termina el anterior)
+PAUSA_ENTRE_MENSAJES = 0
+
+# Estrategias XPath por elemento de la interfaz. El orden es solo el inicial:
+# REGISTRO_SELECTORES prueba primero la que funcionó en ejecuciones anteriores.
+SELECTORES_CAMPO_TEXTO = [
+    # Selector por contenedor y atributos específicos (más precisos)
+    '//footer//div[@role="textbox"]',
+    '//div[@role="textbox" and @contenteditable="true"]',
+    '//div[@data-testid="conversation-compose-box-input"]',
+    '//div[@title="Escribe un mensaje" and @role="textbox"]',
+
+    # Selectores por jerarquía específica (útil si la estructura cambia pero mantiene la relación)
+    '//footer//div[@contenteditable="true"]',
+    '//div[contains(@class,"copyable-text") and @contenteditable="true"]',
+
+    # Selectores por características generales (menos precisos pero más resistentes a cambios)
+    '//div[@contenteditable="true"]',
+    '//div[@spellcheck="true" and @contenteditable="true"]',
+]
+
+SELECTORES_BOTON_ENVIAR = [
+    '//button[@data-testid="compose-btn-send"]',
+    '//button[@aria-label="Enviar"]',
+    '//button[contains(@class, "tvf2evcx")]//span[@data-testid="send"]',
+    '//span[@data-icon="send"]/..',
+]
+
+# Botón "Continuar" de las ventanas emergentes
+SELECTORES_VENTANA_EMERGENTE = [
+    # Por texto visible
+    "//div[text()='Continuar']",
+    "//button//div[contains(text(), 'Continuar')]",
+    # Por clase y texto (desde el HTML proporcionado)
+    "//div[contains(@class, 'tvf2evcx') and contains(text(), 'Continuar')]",
+    # Estrategia genérica por contenido de la ventana
+    "//div[contains(., 'Un nuevo aspecto para WhatsApp Web')]//button",
+    # Botón genérico en ventana emergente
+    "//div[@role='dialog']//button",
+]
+
+SCRIPT_PAGINA_LISTA = "return document.readyState === 'complete';"
+
+SCRIPT_CAMPO_ACTIVO = "return document.activeElement === arguments[0] || arguments[0].contains(document.activeElement);"
+
+SCRIPT_CAMPO_CON_TEXTO = "return arguments[0].textContent.trim().length > 0;"
+
+SCRIPT_CONTAR_SALIENTES = "return document.querySelectorAll('div.message-out').length;"
+
+# El envío terminó cuando hay una burbuja saliente nueva y el campo quedó
+# vacío (arguments[0]: XPath con el que se encontró el campo de texto)
+SCRIPT_ENVIO_COMPLETADO = """
+const nodos = document.evaluate(arguments[0], document, null,
+    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+let campo = null;
+for (let i = 0; i < nodos.snapshotLength && !campo; i++) {
+    if (nodos.snapshotItem(i).closest('#main, footer')) campo = nodos.snapshotItem(i);
+}
+const salientes = document.querySelectorAll('div.message-out').length;
+return salientes > arguments[1] && (!campo || campo.textContent.trim() === '');
+"""
+
+# Carrera entre el chat y el aviso de número inválido: retorna 'invalido' si
+# WhatsApp muestra el aviso, [índice, campo] con la primera estrategia de
+# arguments[0] (ver REGISTRO_SELECTORES) que encuentra el campo de texto
+# dentro de la conversación (no el buscador de chats), o null
+SCRIPT_CHAT_O_INVALIDO = """
+const textoInvalido = /Phone number shared via url is invalid|dirección URL no es válido/;
+for (const d of document.querySelectorAll('[role="dialog"], [data-animate-modal-popup="true"]')) {
+    if (textoInvalido.test(d.textContent)) return 'invalido';
+}
+const xpaths = arguments[0];
+for (let i = 0; i < xpaths.length; i++) {
+    const nodos = document.evaluate(xpaths[i], document, null,
+        XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let j = 0; j < nodos.snapshotLength; j++) {
+        const nodo = nodos.snapshotItem(j);
+        if (nodo.closest('#main, footer')) return [i, nodo];
+    }
+}
+return null;
+"""
+
+# Estado de la última burbuja saliente en una sola llamada al driver:
+# 'entregado', 'enviado', 'en_cola', 'invalido', 'error' o null
+SCRIPT_ESTADO_ENVIO = """
+const textoInvalido = /Phone number shared via url is invalid|dirección URL no es válido/;
+for (const d of document.querySelectorAll('[role="dialog"], [data-animate-modal-popup="true"]')) {
+    if (textoInvalido.test(d.textContent)) return 'invalido';
+}
+const salientes = document.querySelectorAll('div.message-out');
+if (!salientes.length) return null;
+const ultimo = salientes[salientes.length - 1];
+if (ultimo.querySelector('[data-icon="msg-dblcheck"], [data-icon="msg-dblcheck-ack"], ' +
+        '[aria-label*="Entregado"], [aria-label*="Leído"]')) return 'entregado';
+if (ultimo.querySelector('[data-icon="msg-check"], [aria-label*="Enviado"]')) return 'enviado';
+if (ultimo.querySelector('[data-icon="msg-time"]')) return 'en_cola';
+if (ultimo.querySelector('[data-icon*="error"], [class*="error"]')) return 'error';
+return null;
+"""
+
+# Resultado de verificar_envio para cada estado del script anterior
+RESULTADOS_ENVIO = {
+    "entregado": (True, "Mensaje entregado"),
+    "enviado": (True, "Mensaje enviado"),
+    "en_cola": (False, "Mensaje en cola"),
+    "invalido": (False, "Número inválido"),
+    "error": (False, "Número no disponible en WhatsApp"),
+}
+
+# Detecta en una sola llamada si WhatsApp Web ya tiene sesión (perfil
+# persistente) o si está mostrando el código QR
+SCRIPT_ESTADO_SESION = """
+if (document.querySelector('#pane-side') ||
+    localStorage.getItem('last-wid-md') || localStorage.getItem('last-wid')) {
+    return 'sesion';
+}
+if (document.querySelector('canvas[aria-label], div[data-ref]')) {
+    return 'qr';
+}
+return null;
+"""
+
+def configurar_navegador(perfil=PERFIL_PREDETERMINADO, ligero=False):
+    """Configura y devuelve una instancia de Chrome WebDriver
+    
+    perfil: cuenta cuyo perfil persistente (user-data-dir) se reutiliza para
+    conservar la sesión de WhatsApp entre ejecuciones. Con None se usa una
+    ventana de incógnito sin sesión guardada.
+    ligero: Chrome sin ventana y sin imágenes, video ni fuentes. El código QR
+    no se puede escanear en este modo: la cuenta debe haber iniciado sesión
+    antes en modo normal.
+    """
     options = webdriver.ChromeOptions()
     
-    # Forzar modo incógnito
-    options.add_argument('--incognito')
+    if perfil:
+        # Perfil persistente: la sesión de WhatsApp Web se conserva
+        if perfil_en_uso(perfil):
+            print(f"⚠️ El perfil '{perfil}' parece estar abierto en otro Chrome")
+        carpeta = ruta_perfil(perfil)
+        if ligero and not os.listdir(carpeta):
+            print(f"⚠️ El perfil '{perfil}' no tiene sesión guardada; inicie sesión una vez sin el modo ligero")
+        options.add_argument(f'--user-data-dir={carpeta}')
+    else:
+        # Forzar modo incógnito
+        options.add_argument('--incognito')
     
     # Configuraciones básicas
-    options.add_argument('--start-maximized')
+    if ligero:
+        for opcion in OPCIONES_MODO_LIGERO:
+            options.add_argument(opcion)
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2
+        })
+    else:
+        options.add_argument('--start-maximized')
     options.add_argument('--disable-extensions')
     options.add_argument('--disable-notifications')
     options.add_argument('--disable-popup-blocking')
@@ -50,13 +362,45 @@ def configurar_navegador():
     })
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
+    if ligero:
+        # Bloquear imágenes, video y fuentes antes de que se descarguen
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {"urls": URLS_BLOQUEADAS_MODO_LIGERO})
+    
     # Navegar directamente a WhatsApp Web
-    driver.get("https://web.whatsapp.com/")
+    driver.get(URL_WHATSAPP)
     
     return driver
 
+def esperar_script(driver, script, timeout, *args, intervalo=0.1):
+    """Espera hasta que el script retorne un valor verdadero y lo retorna.
+    
+    Lanza TimeoutException si no ocurre antes de `timeout` segundos.
+    """
+    return WebDriverWait(driver, timeout, poll_frequency=intervalo).until(
+        lambda d: d.execute_script(script, *args)
+    )
+
+def detectar_sesion(driver, timeout=5):
+    """Retorna 'sesion' si WhatsApp Web ya está autenticado, 'qr' si pide
+    escanear el código o None si no se pudo determinar a tiempo"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(SCRIPT_ESTADO_SESION)
+        )
+    except TimeoutException:
+        return None
+
 def esperar_inicio_sesion(driver):
     """Espera a que el usuario inicie sesión en WhatsApp Web"""
+    # Con un perfil persistente la sesión suele estar activa: no hace falta QR
+    if detectar_sesion(driver) == "sesion":
+        # Las ventanas de bienvenida también aparecen con un perfil
+        # reutilizado; si quedan abiertas interceptan el clic en el chat
+        cerrar_ventana_emergente_visible(driver)
+        print("✅ Sesión existente reutilizada")
+        return True
+    
     print("🔍 Por favor escanea el código QR de WhatsApp Web...")
     
     try:
@@ -73,8 +417,10 @@ def esperar_inicio_sesion(driver):
         except:
             pass
             
-        # Dar tiempo para que cargue la interfaz
-        time.sleep(5)
+        # Esperar a que cargue la lista de chats
+        WebDriverWait(driver, TIEMPOS_ESPERA["interfaz"], poll_frequency=0.2).until(
+            EC.presence_of_element_located((By.ID, "pane-side"))
+        )
         
         # Manejar ventanas emergentes iniciales
         manejar_ventanas_emergentes(driver)
@@ -86,100 +432,226 @@ def esperar_inicio_sesion(driver):
         print(f"❌ Error al iniciar sesión: {str(e)}")
         return False
 
-def verificar_envio(driver, timeout=10):
+def consultar_estado_envio(driver):
+    """Retorna el estado de la última burbuja saliente (una sola llamada)"""
+    return driver.execute_script(SCRIPT_ESTADO_ENVIO)
+
+def verificar_envio(driver, timeout=10, intervalo=0.1):
     """Verifica si el mensaje se envió correctamente"""
+    ultimo_estado = [None]
+    
+    def estado_final(d):
+        # 'en_cola' no es definitivo: seguir consultando hasta el tope
+        ultimo_estado[0] = consultar_estado_envio(d)
+        return ultimo_estado[0] not in (None, "en_cola")
+    
     try:
-        # Esperar a que aparezca cualquier indicador de estado
-        WebDriverWait(driver, timeout).until(
-            lambda d: (
-                d.find_elements(By.XPATH, '//span[@data-icon="msg-check"]') or
-                d.find_elements(By.XPATH, '//span[@data-icon="msg-dblcheck"]') or
-                d.find_elements(By.XPATH, '//span[@data-icon="msg-time"]') or
-                d.find_elements(By.XPATH, '//div[contains(@class, "error")]')
-            )
-        )
-        
-        # Verificar estado del mensaje
-        if driver.find_elements(By.XPATH, '//span[@data-icon="msg-dblcheck"]'):
-            return True, "Mensaje entregado"
-        elif driver.find_elements(By.XPATH, '//span[@data-icon="msg-check"]'):
-            return True, "Mensaje enviado"
-        elif driver.find_elements(By.XPATH, '//span[@data-icon="msg-time"]'):
-            return False, "Mensaje en cola"
-        elif driver.find_elements(By.XPATH, '//div[contains(@class, "error")]'):
-            return False, "Número no disponible en WhatsApp"
-            
-        return False, "Estado desconocido"
-            
+        WebDriverWait(driver, timeout, poll_frequency=intervalo).until(estado_final)
     except TimeoutException:
-        # Verificar si hay error de número inválido
-        if driver.find_elements(By.XPATH, '//div[contains(text(), "Phone number shared via url is invalid")]'):
-            return False, "Número inválido"
-        return False, "No se detectó confirmación"
+        if ultimo_estado[0] is None:
+            return False, "No se detectó confirmación"
+    
+    return RESULTADOS_ENVIO[ultimo_estado[0]]
+
+def esperar_envio_completado(driver, salientes_previos, timeout=None, xpath_campo=None):
+    """Espera a que aparezca la burbuja saliente y se vacíe el campo de texto
+
+    xpath_campo: estrategia con la que se encontró el campo (por defecto la
+    mejor del ranking de REGISTRO_SELECTORES).
+    """
+    if xpath_campo is None:
+        xpath_campo = REGISTRO_SELECTORES.ordenar("campo_texto", SELECTORES_CAMPO_TEXTO)[0]
+    esperar_script(
+        driver, SCRIPT_ENVIO_COMPLETADO,
+        TIEMPOS_ESPERA["envio"] if timeout is None else timeout,
+        xpath_campo, salientes_previos
+    )
+
+def escribir_mensaje_por_caracter(driver, mensaje):
+    """Escribe el mensaje tecla por tecla usando Shift+Enter entre líneas"""
+    actions = ActionChains(driver)
+    
+    # Dividir el mensaje en líneas
+    lineas = mensaje.strip().split('\n')
+    
+    # Escribir cada línea con Shift+Enter entre ellas
+    for i, linea in enumerate(lineas):
+        if linea.strip():  # Solo procesar líneas no vacías
+            # Escribir la línea actual carácter por carácter
+            for caracter in linea:
+                actions.send_keys(caracter)
+                actions.perform()
+                # Breve pausa para simular escritura natural
+                time.sleep(0.01)
+            
+        # Si no es la última línea, agregar Shift+Enter
+        if i < len(lineas) - 1:
+            # Presionar Shift+Enter juntos para crear un salto de línea
+            actions.key_down(Keys.SHIFT)
+            actions.send_keys(Keys.ENTER)
+            actions.key_up(Keys.SHIFT)
+            actions.perform()
+
+def escribir_mensaje_pegando(driver, campo_texto, mensaje):
+    """Inserta el mensaje completo con un único evento de pegado.
+    
+    El campo se vacía antes y se espera a que muestre exactamente el mensaje
+    (WhatsApp puede procesar el pegado en diferido); si no ocurre se prueba
+    con insertText. Retorna True si el campo quedó con el mensaje; si no, lo
+    deja vacío para escribirlo de otra forma.
+    """
+    texto = mensaje.strip()
+    try:
+        for script in (SCRIPT_PEGAR_TEXTO, SCRIPT_INSERTAR_TEXTO):
+            driver.execute_script(script, campo_texto, texto)
+            try:
+                esperar_script(
+                    driver, SCRIPT_CAMPO_CON_MENSAJE, TIEMPOS_ESPERA["pegado"], campo_texto, texto
+                )
+                return True
+            except TimeoutException:
+                continue
+        driver.execute_script(SCRIPT_VACIAR_CAMPO, campo_texto)
+    except Exception as e:
+        print(f"⚠️ Error al pegar el mensaje: {str(e)}")
+    return False
+
+def abrir_chat(driver, telefono, modo_navegacion=MODO_NAVEGACION):
+    """Abre el chat del destinatario. Retorna el modo que se usó
+    
+    En modo "interna" el chat se abre sin recargar WhatsApp Web; si no se
+    puede, se recarga la página con /send?phone= como respaldo.
+    """
+    if modo_navegacion == "interna" and _FALLOS_NAVEGACION.get(driver, 0) < MAX_FALLOS_NAVEGACION_INTERNA:
+        try:
+            resultado = driver.execute_script(SCRIPT_ABRIR_CHAT_INTERNO, telefono)
+            if resultado == "abierto":
+                esperar_script(driver, SCRIPT_CHAT_CAMBIADO, TIEMPOS_ESPERA["chat_interno"])
+                _FALLOS_NAVEGACION[driver] = 0
+                return "interna"
+        except Exception:
+            # Sin respuesta de la app: se recarga la página como respaldo
+            pass
+        
+        fallos = _FALLOS_NAVEGACION.get(driver, 0) + 1
+        _FALLOS_NAVEGACION[driver] = fallos
+        if fallos == MAX_FALLOS_NAVEGACION_INTERNA:
+            print("⚠️ La navegación interna no funciona en esta sesión, se recargará cada chat")
+    
+    driver.get(f"{URL_WHATSAPP}send?phone={telefono}")
+    return "recarga"
 
-def enviar_mensaje(driver, telefono, mensaje):
-    """Envía un mensaje por WhatsApp manteniendo los saltos de línea"""
+def enviar_mensaje(driver, telefono, mensaje, modo_escritura=MODO_ESCRITURA, numeros_invalidos=None,
+                   modo_navegacion=MODO_NAVEGACION):
+    """Envía un mensaje por WhatsApp manteniendo los saltos de línea
+    
+    modo_escritura: "pegar" inserta todo el texto de una vez (rápido),
+    "caracter" lo escribe tecla por tecla (modo anterior, más lento).
+    modo_navegacion: "interna" abre el chat sin recargar la aplicación,
+    "recarga" carga /send?phone= para cada destinatario (ver abrir_chat).
+    numeros_invalidos (CacheNumerosInvalidos): si WhatsApp avisa que el
+    número no es válido, se agrega para omitirlo en próximas campañas.
+    
+    El registro incluye "tiempos": segundos por fase (ver metrics.FASES) y
+    "enviado": True si apareció la burbuja del mensaje (ya salió del campo
+    de texto, aunque todavía no tenga check); "confirmado" indica el check.
+    """
+    tiempos = TiemposEnvio()
     try:
         # Navegación al chat
         print(f"🔄 Navegando al chat de {telefono}...")
-        driver.get(f"https://web.whatsapp.com/send?phone={telefono}")
+        with tiempos.fase("navegacion"):
+            abrir_chat(driver, telefono, modo_navegacion)
         
         print("⏳ Esperando carga de chat...")
-        # Esperar por el campo de texto
-        campo_texto = WebDriverWait(driver, 15).until(
-            EC.element_to_be_clickable((By.XPATH, '//footer//div[@role="textbox"]'))
-        )
-        print("✅ Chat cargado correctamente")
-        
-        # Hacer clic para asegurarnos de que está activo
-        campo_texto.click()
-        time.sleep(0.5)
+        with tiempos.fase("chat_listo"):
+            # Esperar por el campo de texto o por el aviso de número inválido;
+            # las estrategias del campo se prueban en el orden aprendido
+            estrategias = REGISTRO_SELECTORES.ordenar("campo_texto", SELECTORES_CAMPO_TEXTO)
+            encontrado = esperar_script(
+                driver, SCRIPT_CHAT_O_INVALIDO, TIEMPOS_ESPERA["chat"], estrategias
+            )
+            if encontrado == "invalido":
+                print(f"🚫 {telefono} - {MOTIVO_INVALIDO}")
+                driver.execute_script(SCRIPT_CERRAR_AVISO_INVALIDO)
+                if numeros_invalidos is not None:
+                    numeros_invalidos.agregar(telefono)
+                return {
+                    "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "telefono": telefono,
+                    "estado": "Fallo",
+                    "detalle": MOTIVO_INVALIDO,
+                    "confirmado": False,
+                    "enviado": False,
+                    "tiempos": tiempos.como_dict()
+                }
+            indice_estrategia, campo_texto = encontrado
+            xpath_campo = estrategias[indice_estrategia]
+            REGISTRO_SELECTORES.registrar_exito("campo_texto", xpath_campo, SELECTORES_CAMPO_TEXTO)
+            print("✅ Chat cargado correctamente")
+            
+            # Hacer clic para asegurarnos de que está activo; si una ventana
+            # emergente tapa el campo se cierra y se vuelve a intentar
+            try:
+                campo_texto.click()
+            except ElementClickInterceptedException:
+                if not cerrar_ventana_emergente_visible(driver):
+                    raise
+                campo_texto.click()
+            esperar_script(driver, SCRIPT_CAMPO_ACTIVO, TIEMPOS_ESPERA["foco"], campo_texto)
         
-        # MÉTODO MEJORADO: Usar ActionChains para más control sobre las teclas
         print("📝 Escribiendo mensaje...")
+        with tiempos.fase("escritura"):
+            if modo_escritura == "pegar":
+                # Insertar el mensaje completo en una sola llamada al driver;
+                # si WhatsApp no acepta el pegado se vuelve a la escritura por carácter
+                if not escribir_mensaje_pegando(driver, campo_texto, mensaje):
+                    print("⚠️ Pegado no aceptado, escribiendo carácter por carácter...")
+                    escribir_mensaje_por_caracter(driver, mensaje)
+            else:
+                escribir_mensaje_por_caracter(driver, mensaje)
+            
+            # Esperar a que el texto esté en el campo antes de enviar
+            esperar_script(driver, SCRIPT_CAMPO_CON_TEXTO, TIEMPOS_ESPERA["texto"], campo_texto)
         
-        # Importar ActionChains si aún no está importado
-        from selenium.webdriver.common.action_chains import ActionChains
-        actions = ActionChains(driver)
-        
-        # Dividir el mensaje en líneas
-        lineas = mensaje.strip().split('\n')
-        
-        # Escribir cada línea con Shift+Enter entre ellas
-        for i, linea in enumerate(lineas):
-            if linea.strip():  # Solo procesar líneas no vacías
-                # Escribir la línea actual carácter por carácter
-                for caracter in linea:
-                    actions.send_keys(caracter)
-                    actions.perform()
-                    # Breve pausa para simular escritura natural
-                    time.sleep(0.01)
-                
-            # Si no es la última línea, agregar Shift+Enter
-            if i < len(lineas) - 1:
-                # Presionar Shift+Enter juntos para crear un salto de línea
-                actions.key_down(Keys.SHIFT)
-                actions.send_keys(Keys.ENTER)
-                actions.key_up(Keys.SHIFT)
-                actions.perform()
-                time.sleep(0.1)
-        
-        # Pequeña pausa antes de enviar
-        time.sleep(0.5)
-        
-        # Enviar el mensaje
-        actions.send_keys(Keys.ENTER)
-        actions.perform()
+        with tiempos.fase("envio"):
+            salientes = driver.execute_script(SCRIPT_CONTAR_SALIENTES)
+            
+            # Enviar el mensaje
+            ActionChains(driver).send_keys(Keys.ENTER).perform()
+            
+            # Esperar la burbuja del mensaje enviado y el campo de texto vacío.
+            # Enter ya se presionó: si no aparece a tiempo no es un error (el
+            # mensaje pudo haber salido) y no debe reintentarse
+            try:
+                esperar_envio_completado(driver, salientes, xpath_campo=xpath_campo)
+                burbuja = True
+            except TimeoutException:
+                burbuja = False
         
-        print(f"✅ {telefono} - Mensaje enviado")
-        time.sleep(1.5)
+        # Confirmar el estado real de la burbuja (check / doble check)
+        with tiempos.fase("verificacion"):
+            confirmado, detalle = verificar_envio(driver)
+        if burbuja:
+            estado = "Éxito" if confirmado else "Fallo"
+        else:
+            # Sin burbuja nueva el estado leído puede ser el de un mensaje anterior
+            estado = "Sin confirmar" if detalle == "No se detectó confirmación" else "Pendiente"
+            detalle = f"No se detectó la burbuja del mensaje enviado ({detalle})"
+            confirmado = False
+        if confirmado:
+            print(f"✅ {telefono} - {detalle}")
+        else:
+            print(f"⚠️ {telefono} - {detalle}")
         
         return {
             "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "telefono": telefono, 
-            "estado": "Éxito",
-            "detalle": "Mensaje enviado",
-            "confirmado": True
+            "estado": estado,
+            "detalle": detalle,
+            "confirmado": confirmado,
+            "enviado": burbuja,
+            "tiempos": tiempos.como_dict()
         }
             
     except Exception as e:
@@ -190,57 +662,67 @@ def enviar_mensaje(driver, telefono, mensaje):
             "telefono": telefono,
             "estado": "Error",
             "detalle": str(e),
-            "confirmado": False
+            "confirmado": False,
+            "enviado": False,
+            "tiempos": tiempos.como_dict()
         }
 
 def manejar_ventanas_emergentes(driver):
     """Maneja múltiples tipos de ventanas emergentes en WhatsApp Web"""
-    # Lista de estrategias para encontrar el botón "Continuar"
-    estrategias = [
-        # Por texto visible
-        "//div[text()='Continuar']",
-        "//button//div[contains(text(), 'Continuar')]",
-        # Por clase y texto (desde el HTML proporcionado)
-        "//div[contains(@class, 'tvf2evcx') and contains(text(), 'Continuar')]",
-        # Estrategia genérica por contenido de la ventana
-        "//div[contains(., 'Un nuevo aspecto para WhatsApp Web')]//button",
-        # Botón genérico en ventana emergente
-        "//div[@role='dialog']//button",
-    ]
-    
-    # Intentar cada estrategia
-    for intento in range(3):  # Intentar hasta 3 veces
-        for xpath in estrategias:
-            try:
-                # Esperar brevemente a que aparezca el botón
-                boton = WebDriverWait(driver, 2).until(
-                    EC.element_to_be_clickable((By.XPATH, xpath))
-                )
-                boton.click()
-                print("✅ Ventana emergente cerrada con éxito")
-                time.sleep(1)
-                return True
-            except:
-                continue
-        
-        # Esperar un momento antes del siguiente intento
-        time.sleep(1)
+    # Esperar a que alguna estrategia encuentre un botón (todas en cada consulta)
+    try:
+        boton = REGISTRO_SELECTORES.buscar(
+            driver, "ventana_emergente", SELECTORES_VENTANA_EMERGENTE,
+            TIEMPOS_ESPERA["ventana_emergente"], intervalo=0.2
+        )
+    except TimeoutException:
+        # No apareció ninguna ventana emergente
+        return False
     
-    # Si llegamos aquí, no pudimos cerrar ninguna ventana emergente
-    # (posiblemente porque no había ninguna)
-    return False
+    try:
+        boton.click()
+        # Esperar a que la ventana se cierre
+        WebDriverWait(driver, TIEMPOS_ESPERA["ventana_emergente"], poll_frequency=0.1).until(
+            EC.staleness_of(boton)
+        )
+        print("✅ Ventana emergente cerrada con éxito")
+        return True
+    except Exception:
+        return False
+
+def cerrar_ventana_emergente_visible(driver):
+    """Cierra una ventana emergente si ya está en pantalla, sin esperarla
+
+    Es una sola consulta al driver cuando no hay ninguna. Retorna True si
+    se cerró una ventana.
+    """
+    try:
+        boton = REGISTRO_SELECTORES.consultar(driver, "ventana_emergente", SELECTORES_VENTANA_EMERGENTE)
+        if boton is None:
+            return False
+        boton.click()
+        WebDriverWait(driver, TIEMPOS_ESPERA["ventana_emergente"], poll_frequency=0.1).until(
+            EC.staleness_of(boton)
+        )
+        print("✅ Ventana emergente cerrada con éxito")
+        return True
+    except Exception:
+        return False
 
 def encontrar_campo_texto(driver):
     """Busca el campo de texto utilizando métodos más robustos"""
     print("🔍 Buscando campo de texto...")
     
-    # Esperar más tiempo para asegurar que la página cargue completamente
-    time.sleep(8)
+    # Esperar a que la página termine de cargar
+    try:
+        esperar_script(driver, SCRIPT_PAGINA_LISTA, TIEMPOS_ESPERA["pagina"])
+    except TimeoutException:
+        print("⚠️ La página no terminó de cargar a tiempo")
     
     # Verificar primero que no estamos en la página principal sino en un chat
     try:
         # Buscar algún elemento que confirme que estamos en un chat
-        WebDriverWait(driver, 10).until(
+        WebDriverWait(driver, TIEMPOS_ESPERA["chat"], poll_frequency=0.1).until(
             EC.any_of(
                 EC.presence_of_element_located((By.XPATH, '//header//span[@data-testid="conversation-info-header-chat-title"]')),
                 EC.presence_of_element_located((By.XPATH, '//div[@role="textbox"]')),
@@ -252,71 +734,46 @@ def encontrar_campo_texto(driver):
         print("⚠️ No se detectó un chat abierto correctamente")
         return None
     
-    # Selectores específicos para WhatsApp Web actual (julio 2025)
-    selectores_actualizados = [
-        # Selector por contenedor y atributos específicos (más precisos)
-        '//footer//div[@role="textbox"]',
-        '//div[@role="textbox" and @contenteditable="true"]',
-        '//div[@data-testid="conversation-compose-box-input"]',
-        '//div[@title="Escribe un mensaje" and @role="textbox"]',
-        
-        # Selectores por jerarquía específica (útil si la estructura cambia pero mantiene la relación)
-        '//footer//div[@contenteditable="true"]',
-        '//div[contains(@class,"copyable-text") and @contenteditable="true"]',
+    # Todas las estrategias se prueban en cada consulta, la mejor primero
+    try:
+        campo = REGISTRO_SELECTORES.buscar(
+            driver, "campo_texto", SELECTORES_CAMPO_TEXTO, TIEMPOS_ESPERA["chat"]
+        )
+    except TimeoutException:
+        print("❌ No se pudo encontrar el campo de texto")
+        return None
+
+    try:
+        # Hacer clic en el campo para asegurarnos que está activo
+        driver.execute_script("arguments[0].click();", campo)
+        esperar_script(driver, SCRIPT_CAMPO_ACTIVO, TIEMPOS_ESPERA["foco"], campo)
         
-        # Selectores por características generales (menos precisos pero más resistentes a cambios)
-        '//div[@contenteditable="true"]',
-        '//div[@spellcheck="true" and @contenteditable="true"]',
-    ]
-    
-    # Probar cada selector con tiempo de espera corto
-    for selector in selectores_actualizados:
-        try:
-            print(f"Probando selector: {selector}")
-            campo = WebDriverWait(driver, 3).until(
-                EC.element_to_be_clickable((By.XPATH, selector))
-            )
-            
-            # Hacer clic en el campo para asegurarnos que está activo
-            driver.execute_script("arguments[0].click();", campo)
-            time.sleep(1)
-            
-            # Limpiar cualquier contenido previo
-            driver.execute_script("arguments[0].innerHTML = '';", campo)
-            
-            print(f"✅ Campo de texto encontrado con selector: {selector}")
-            return campo
-        except Exception as e:
-            continue
+        # Limpiar cualquier contenido previo
+        driver.execute_script("arguments[0].innerHTML = '';", campo)
+    except Exception as e:
+        print(f"❌ No se pudo activar el campo de texto: {str(e)}")
+        return None
     
-    print("❌ No se pudo encontrar el campo de texto")
-    return None
+    print("✅ Campo de texto encontrado")
+    return campo
 
 def enviar_mensaje_con_boton_o_enter(driver, campo_texto):
     """Intenta enviar el mensaje usando botón o Enter"""
     intentos = 0
     enviado = False
+    salientes = driver.execute_script(SCRIPT_CONTAR_SALIENTES)
     
     while intentos < 3 and not enviado:
         try:
             # Intentar con el botón de enviar
-            botones = [
-                '//button[@data-testid="compose-btn-send"]',
-                '//button[@aria-label="Enviar"]',
-                '//button[contains(@class, "tvf2evcx")]//span[@data-testid="send"]',
-                '//span[@data-icon="send"]/..',
-            ]
-            
-            for selector in botones:
-                try:
-                    boton = WebDriverWait(driver, 2).until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    boton.click()
-                    enviado = True
-                    break
-                except:
-                    continue
+            try:
+                boton = REGISTRO_SELECTORES.buscar(
+                    driver, "boton_enviar", SELECTORES_BOTON_ENVIAR, TIEMPOS_ESPERA["boton"]
+                )
+                boton.click()
+                enviado = True
+            except Exception:
+                pass
             
             # Si no se pudo con el botón, intentar con Enter
             if not enviado:
@@ -325,88 +782,53 @@ def enviar_mensaje_con_boton_o_enter(driver, campo_texto):
             
         except:
             intentos += 1
-            time.sleep(1)
     
-    # Dar tiempo para que se procese el envío
-    time.sleep(3)
+    # Esperar a que WhatsApp procese el envío
+    if enviado:
+        try:
+            esperar_envio_completado(driver, salientes)
+        except TimeoutException:
+            print("⚠️ No se detectó la burbuja del mensaje enviado")
     return enviado
 
-def verificar_envio_real(driver):
+def verificar_envio_real(driver, timeout=10):
     """Verifica si el mensaje realmente se envió"""
-    # Intentar encontrar indicadores de mensaje enviado
-    indicadores = [
-        '//span[@data-testid="msg-check"]',
-        '//span[@data-icon="msg-check"]',
-        '//span[@aria-label="Enviado"]',
-        '//span[@aria-label="Entregado"]',
-        '//span[@aria-label="Leído"]',
-        '//div[@data-testid="msg-dblcheck"]',
-    ]
-    
-    for selector in indicadores:
-        try:
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, selector))
-            )
-            return True
-        except:
-            continue
-    
-    # Buscar si hay mensajes de error
-    errores = [
-        '//div[contains(text(), "El número de teléfono compartido a través de la dirección URL no es válido")]',
-        '//div[contains(text(), "Phone number shared via url is invalid")]',
-    ]
-    
-    for selector in errores:
-        try:
-            if driver.find_elements(By.XPATH, selector):
-                return False
-        except:
-            continue
-    
-    # Si no encontramos indicadores claros, asumimos que no se envió
-    return False
+    confirmado, _ = verificar_envio(driver, timeout)
+    return confirmado
 
-def guardar_registro(registros):
-    """Guarda los resultados en un archivo estructurado"""
-    with open(ARCHIVO_ERRORES, "w", encoding="utf-8") as f:
-        f.write("FECHA | TELÉFONO | ESTADO | DETALLE\n")
-        f.write("-----------------------------------\n")
+def guardar_registro(registros, ruta_diario=ARCHIVO_DIARIO):
+    """Agrega los resultados al diario de envíos y regenera el reporte
+    estructurado (ARCHIVO_ERRORES) con ellos, a partir del diario"""
+    with DiarioEnvios(ruta_diario) as diario:
+        marca = diario.marca()
         for r in registros:
-            f.write(f"{r['fecha']} | {r['telefono']} | {r['estado']} | {r['detalle']}\n")
-
-def verificar_dependencias():
-    """Verifica que todas las dependencias necesarias estén instaladas"""
-    try:
-        import selenium
-        import pandas
-        import webdriver_manager
-        import openpyxl
-        import customtkinter
-        print("✅ Todas las dependencias están instaladas correctamente")
-        return True
-    except ImportError as e:
-        print(f"❌ Error: Falta instalar algunas dependencias: {str(e)}")
-        print("📝 Por favor, ejecuta: pip install -r requirements.txt")
-        return False
-
+            diario.registrar(r)
+    generar_reporte(ARCHIVO_ERRORES, ruta_diario, desde=diario.desde(marca))
 
 def main():
+    # pandas solo se necesita al ejecutar este script directamente
+    import pandas as pd
+    from app.utils.phone_normalizer import normalizar_telefonos
+    
     verificar_dependencias()
     print("🚀 Iniciando automatización de WhatsApp")
     driver = configurar_navegador()
     registros = []
+    diario = DiarioEnvios()
+    # El reporte final solo incluye los envíos de esta ejecución
+    marca = diario.marca()
+    numeros_invalidos = CacheNumerosInvalidos()
+    metricas = MetricasEnvio()
+    if PUERTO_PROMETHEUS:
+        metricas.iniciar_servidor(PUERTO_PROMETHEUS)
     
     try:
         if esperar_inicio_sesion(driver):
             datos = pd.read_excel(ARCHIVO_EXCEL, engine='openpyxl', dtype={"Telefono": str})
+            # Los números del archivo ya traen el código de país
+            telefonos = normalizar_telefonos(datos["Telefono"], codigo_pais=None)["telefono"]
             
-            for _, fila in datos.iterrows():
-                telefono = fila["Telefono"].strip()
-                if not telefono.startswith("+"):
-                    telefono = f"+{telefono}"
-                
+            for (_, fila), telefono in zip(datos.iterrows(), telefonos):
                 mensaje = MENSAJE_BASE.format(
                     nombre=fila["Nombre"],
                     apellido=fila.get("Apellido", ""),
@@ -414,20 +836,44 @@ def main():
                     cedula=fila["Cedula"]
                 )
                 
+                if telefono in numeros_invalidos:
+                    # WhatsApp ya reportó este número: no abrir el chat
+                    print(f"⏭️ Omitido: {fila['Nombre']} ({telefono}) - número inválido conocido")
+                    registro = {
+                        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "telefono": telefono,
+                        "estado": "Omitido",
+                        "detalle": numeros_invalidos.motivo(telefono),
+                        "confirmado": False
+                    }
+                    registros.append(registro)
+                    diario.registrar(registro)
+                    metricas.registrar(registro)
+                    continue
+                
                 print(f"\n📤 Procesando: {fila['Nombre']} ({telefono})...")
-                registro = enviar_mensaje(driver, telefono, mensaje)
-                registros.append(registro)
+                registro = enviar_mensaje(driver, telefono, mensaje, numeros_invalidos=numeros_invalidos)
                 
-                # OPTIMIZACIÓN: Reducir el tiempo entre mensajes
-                time.sleep(3)  # Tiempo suficiente para evitar bloqueos pero no excesivo
+                # enviar_mensaje ya esperó a que WhatsApp procesara el envío
+                if PAUSA_ENTRE_MENSAJES:
+                    inicio_pausa = time.perf_counter()
+                    time.sleep(PAUSA_ENTRE_MENSAJES)
+                    registro["tiempos"]["pausa"] = round(time.perf_counter() - inicio_pausa, 4)
+                
+                registros.append(registro)
+                diario.registrar(registro)  # Queda guardado aunque el proceso falle
+                metricas.registrar(registro)
             
             # Generar reporte
             exitosos = sum(1 for r in registros if r['confirmado'])
-            guardar_registro(registros)
+            diario.cerrar()
+            generar_reporte(ARCHIVO_ERRORES, diario.ruta, desde=diario.desde(marca))
             print(f"\n📊 Resultado final: {exitosos}/{len(datos)} enviados exitosamente")
             print(f"📄 Registro completo guardado en: {ARCHIVO_ERRORES}")
+            print(f"⏱️ Tiempos por fase guardados en: {metricas.exportar()}")
     
     finally:
+        diario.cerrar()
         driver.quit()
         print("\n🏁 Proceso completado")
 
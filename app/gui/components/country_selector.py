@@ -1,139 +1,207 @@
 import customtkinter as ctk
 from tkinter import StringVar
+from app.utils.country_codes import INDICE_PAISES
+
+# Espera (ms) tras la última tecla antes de filtrar la lista
+SEARCH_DEBOUNCE_MS = 150
+
+# Filas de la lista desplegable; se crean una vez y solo cambian su texto
+VISIBLE_ROWS = 10
+ROW_HEIGHT = 24
+
+# Filas que se desplazan con cada paso de la rueda del mouse
+WHEEL_STEP = 3
 
 class CountrySelector(ctk.CTkFrame):
     """Selector de país con búsqueda para códigos telefónicos"""
-    
+
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
-        
+
         # Inicializar atributos
         self.dropdown_visible = False  # Añadir esta línea
         self.dropdown = None
-    
+        self.rows = []
+        self.results = []
+        self.offset = 0
+        self.pending_search = None
+
         # Cargar datos de países
         self.countries = self.load_countries()
-        
+
         # Variables
         self.selected_country = StringVar(value="Colombia (+57)")
         self.selected_code = "+57"  # Valor por defecto
-        
+
         # Crear interfaz
         self.create_widgets()
-        
+
     def load_countries(self):
-        """Carga lista de países con sus códigos"""
-        # Lista básica de países populares con sus códigos
-        return [
-            {"name": "Argentina", "code": "+54"},
-            {"name": "Bolivia", "code": "+591"},
-            {"name": "Brasil", "code": "+55"},
-            {"name": "Chile", "code": "+56"},
-            {"name": "Colombia", "code": "+57"},
-            {"name": "Costa Rica", "code": "+506"},
-            {"name": "Cuba", "code": "+53"},
-            {"name": "Ecuador", "code": "+593"},
-            {"name": "El Salvador", "code": "+503"},
-            {"name": "España", "code": "+34"},
-            {"name": "Estados Unidos", "code": "+1"},
-            {"name": "Guatemala", "code": "+502"},
-            {"name": "Honduras", "code": "+504"},
-            {"name": "México", "code": "+52"},
-            {"name": "Nicaragua", "code": "+505"},
-            {"name": "Panamá", "code": "+507"},
-            {"name": "Paraguay", "code": "+595"},
-            {"name": "Perú", "code": "+51"},
-            {"name": "Portugal", "code": "+351"},
-            {"name": "República Dominicana", "code": "+1"},
-            {"name": "Uruguay", "code": "+598"},
-            {"name": "Venezuela", "code": "+58"}
-        ]
-    
+        """Carga lista de países con sus códigos (tabla UIT completa)"""
+        return INDICE_PAISES.paises
+
     def create_widgets(self):
         """Crea los widgets del selector"""
         # Etiqueta
         self.label = ctk.CTkLabel(self, text="País:")
         self.label.pack(side="left", padx=(0, 5))
-        
+
         # Campo de búsqueda/selección
         self.search_var = StringVar()
         self.search_var.trace("w", self.update_dropdown)
-        
+
         self.search_entry = ctk.CTkEntry(self, textvariable=self.search_var, width=150)
         self.search_entry.insert(0, "Colombia")  # Valor por defecto
         self.search_entry.pack(side="left")
-        
+
         # Botón de dropdown
         self.dropdown_btn = ctk.CTkButton(
             self, text="▼", width=20, command=self.toggle_dropdown
         )
         self.dropdown_btn.pack(side="left")
-        
+
         # Dropdown oculto inicialmente
         self.dropdown_visible = False
         self.dropdown = None
-        
+
     def toggle_dropdown(self):
         """Muestra/oculta el dropdown"""
         if self.dropdown_visible:
             self.hide_dropdown()
         else:
             self.show_dropdown()
-    
-    def show_dropdown(self):
-        """Muestra el dropdown con países filtrados"""
-        # Crear ventana dropdown
+
+    def create_dropdown(self):
+        """Crea la ventana del dropdown y su grupo fijo de filas (una sola vez)"""
         self.dropdown = ctk.CTkToplevel(self)
-        self.dropdown.geometry(f"{300}x{250}+{self.winfo_rootx()}+{self.winfo_rooty() + 30}")
         self.dropdown.overrideredirect(True)
         self.dropdown.attributes("-topmost", True)
-        
-        # Lista de países
-        self.country_frame = ctk.CTkScrollableFrame(self.dropdown, width=280, height=230)
-        self.country_frame.pack(fill="both", expand=True, padx=5, pady=5)
-        
+        self.dropdown.withdraw()
+
+        self.country_frame = ctk.CTkFrame(self.dropdown, width=280)
+        self.country_frame.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+
+        self.scrollbar = ctk.CTkScrollbar(self.dropdown, command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y", pady=5)
+
+        self.empty_label = ctk.CTkLabel(self.country_frame, text="Sin resultados")
+
+        for position in range(VISIBLE_ROWS):
+            row = ctk.CTkButton(
+                self.country_frame,
+                text="",
+                anchor="w",
+                height=ROW_HEIGHT,
+                command=lambda p=position: self.select_row(p)
+            )
+            row.bind("<MouseWheel>", self.on_mousewheel)
+            row.bind("<Button-4>", self.on_mousewheel)
+            row.bind("<Button-5>", self.on_mousewheel)
+            self.rows.append(row)
+
+        self.country_frame.bind("<MouseWheel>", self.on_mousewheel)
+
+    def show_dropdown(self):
+        """Muestra el dropdown con países filtrados"""
+        if self.dropdown is None:
+            self.create_dropdown()
+
+        height = VISIBLE_ROWS * (ROW_HEIGHT + 2) + 20
+        self.dropdown.geometry(f"{300}x{height}+{self.winfo_rootx()}+{self.winfo_rooty() + 30}")
+        self.dropdown.deiconify()
+        self.dropdown.lift()
+
         # Filtrar y mostrar países
-        self.update_country_list()
-        
         self.dropdown_visible = True
-        
+        self.update_country_list()
+
     def update_country_list(self):
         """Actualiza la lista de países según el filtro"""
-        search_text = self.search_var.get().lower()
-        
-        # Limpiar lista actual
-        for widget in self.country_frame.winfo_children():
-            widget.destroy()
-        
-        # Añadir países filtrados
-        for country in self.countries:
-            if search_text in country["name"].lower():
-                btn = ctk.CTkButton(
-                    self.country_frame,
-                    text=f"{country['name']} ({country['code']})",
-                    anchor="w",
-                    command=lambda c=country: self.select_country(c)
-                )
-                btn.pack(fill="x", pady=1)
-    
+        self.pending_search = None
+        self.results = INDICE_PAISES.buscar(self.search_var.get())
+        self.offset = 0
+        self.render_rows()
+
+    def render_rows(self):
+        """Muestra en las filas fijas los resultados desde self.offset"""
+        if not self.dropdown_visible:
+            return
+
+        for position, row in enumerate(self.rows):
+            index = self.offset + position
+            if index < len(self.results):
+                country = self.results[index]
+                row.configure(text=f"{country['name']} ({country['code']})")
+                if not row.winfo_manager():
+                    row.pack(fill="x", pady=1)
+            elif row.winfo_manager():
+                row.pack_forget()
+
+        if self.results:
+            self.empty_label.pack_forget()
+        elif not self.empty_label.winfo_manager():
+            self.empty_label.pack(pady=10)
+
+        # Actualizar la barra de desplazamiento con la porción visible
+        total = max(1, len(self.results))
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + VISIBLE_ROWS) / total))
+
+    def scroll_to(self, offset):
+        """Mueve la lista al resultado indicado"""
+        offset = max(0, min(offset, len(self.results) - VISIBLE_ROWS))
+        if offset != self.offset:
+            self.offset = offset
+            self.render_rows()
+
+    def on_scroll(self, action, amount, unit=None):
+        """Traduce los comandos de la barra vertical a resultados"""
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.results)))
+        elif action == "scroll":
+            step = VISIBLE_ROWS if unit == "pages" else 1
+            self.scroll_to(self.offset + int(amount) * step)
+
+    def on_mousewheel(self, event):
+        """Desplaza la lista con la rueda del mouse"""
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.offset - WHEEL_STEP)
+        else:
+            self.scroll_to(self.offset + WHEEL_STEP)
+        return "break"
+
     def update_dropdown(self, *args):
-        """Actualiza el dropdown al cambiar el texto de búsqueda"""
-        if self.dropdown_visible:
-            self.update_country_list()
-    
+        """Actualiza el dropdown al cambiar el texto de búsqueda
+
+        Se filtra una sola vez cuando el usuario deja de escribir.
+        """
+        if not self.dropdown_visible:
+            return
+        if self.pending_search is not None:
+            self.after_cancel(self.pending_search)
+        self.pending_search = self.after(SEARCH_DEBOUNCE_MS, self.update_country_list)
+
+    def select_row(self, position):
+        """Selecciona el país que muestra la fila indicada"""
+        index = self.offset + position
+        if index < len(self.results):
+            self.select_country(self.results[index])
+
     def select_country(self, country):
         """Selecciona un país del dropdown"""
         self.selected_country.set(f"{country['name']} ({country['code']})")
         self.selected_code = country["code"]
-        self.search_var.set(country["name"])
         self.hide_dropdown()
-    
+        self.search_var.set(country["name"])
+
     def hide_dropdown(self):
-        """Oculta el dropdown"""
+        """Oculta el dropdown (se conserva para reutilizar sus filas)"""
+        if self.pending_search is not None:
+            self.after_cancel(self.pending_search)
+            self.pending_search = None
         if self.dropdown_visible and self.dropdown is not None:
-            self.dropdown.destroy()
+            self.dropdown.withdraw()
             self.dropdown_visible = False
-    
+
     def get_country_code(self):
         """Retorna el código del país seleccionado"""
-        return self.selected_code
\ No newline at end of file
+        return self.selected_code
@@ -1,45 +1,82 @@
-import pandas as pd
 import customtkinter as ctk
-from tkinter import ttk
+from tkinter import ttk, messagebox
+
+# Filas que se desplazan con cada paso de la rueda del mouse
+WHEEL_STEP = 3
+
+# Columna de la tabla vacía inicial
+DEFAULT_COLUMN = "TELEFONO"
+
+# Textos aceptados al editar una celda de una columna booleana
+BOOLEAN_VALUES = {
+    "true": True, "verdadero": True, "si": True, "sí": True, "1": True,
+    "false": False, "falso": False, "no": False, "0": False,
+}
 
 class DynamicTable(ctk.CTkFrame):
+    """Tabla editable respaldada por un DataFrame
+
+    self.df es la única fuente de los datos: agregar filas o columnas y
+    editar celdas modifica el DataFrame, y el Treeview solo muestra la
+    ventana de filas visible (el iid de cada item es su posición en self.df).
+    """
+
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
-        
+
+        # Datos (DataFrame); la tabla vacía inicial se crea al usarla, así
+        # pandas no se carga al abrir la ventana
+        self.df = None
+
+        # Aumenta con cada cambio de datos o columnas (invalida la vista previa)
+        self.version = 0
+
+        # Filas vacías agregadas al final que todavía no están en self.df; se
+        # agregan todas juntas recién cuando se edita una (ver materialize_rows)
+        self.pending_rows = 0
+
+        # Ventana visible de self.df
+        self.offset = 0
+        self.visible_rows = 25
+
+        # Celda en edición: (entry, posición, columna)
+        self.cell_editor = None
+
         # Tabla
         self.table = ttk.Treeview(self, selectmode="extended")
         self.table.pack(fill="both", expand=True, padx=5, pady=5)
-        
-        # Scrollbars
-        self.y_scroll = ttk.Scrollbar(self, orient="vertical", command=self.table.yview)
+
+        # Scrollbars: la vertical recorre el DataFrame, no los items
+        self.y_scroll = ttk.Scrollbar(self, orient="vertical", command=self.on_virtual_scroll)
         self.y_scroll.pack(side="right", fill="y")
-        
+
         self.x_scroll = ttk.Scrollbar(self, orient="horizontal", command=self.table.xview)
         self.x_scroll.pack(side="bottom", fill="x")
-        
-        self.table.configure(
-            yscrollcommand=self.y_scroll.set,
-            xscrollcommand=self.x_scroll.set
-        )
-        
+
+        self.table.configure(xscrollcommand=self.x_scroll.set)
+
+        # Eventos de desplazamiento y edición
+        self.table.bind("<Configure>", self.on_resize)
+        self.table.bind("<MouseWheel>", self.on_mousewheel)
+        self.table.bind("<Button-4>", self.on_mousewheel)
+        self.table.bind("<Button-5>", self.on_mousewheel)
+        self.table.bind("<Double-1>", self.on_double_click)
+
         # Inicializar con columna TELEFONO y fila vacía
-        self.table["columns"] = ("TELEFONO",)
-        self.table.column("#0", width=0, stretch=False)
-        self.table.column("TELEFONO", anchor="w", width=120)
-        self.table.heading("TELEFONO", text="TELEFONO")
-        self.add_empty_row()
-        
+        self.configure_columns((DEFAULT_COLUMN,))
+        self.table.insert("", "end", iid="0", values=("",))
+
         # Botones de control
         self.control_frame = ctk.CTkFrame(self)
         self.control_frame.pack(fill="x", padx=5, pady=5)
-        
+
         self.add_column_btn = ctk.CTkButton(
             self.control_frame,
             text="+ Agregar Columna",
             command=self.add_column
         )
         self.add_column_btn.pack(side="left", padx=5)
-        
+
         self.add_row_btn = ctk.CTkButton(
             self.control_frame,
             text="+ Agregar Fila",
@@ -49,63 +86,158 @@ class DynamicTable(ctk.CTkFrame):
 
     def load_excel(self, filename):
         """Carga datos desde un archivo Excel"""
+        # pandas se carga recién al abrir el primer archivo
+        from app.utils.excel_loader import leer_excel
         try:
-            # Leer Excel 
-            self.df = pd.read_excel(filename)
-            
-            # Estandarizar nombres de columnas (convertir a mayúsculas)
-            self.df.columns = [col.upper() for col in self.df.columns]
-            
-            # Asegurarnos que TELEFONO existe y convertirlo a string
-            if "TELEFONO" in self.df.columns:
-                self.df["TELEFONO"] = self.df["TELEFONO"].astype(str)
-                # Corregir escape sequence usando raw string
-                self.df["TELEFONO"] = self.df["TELEFONO"].replace(r'\.0$', '', regex=True)
-            
-            # Buscar otras columnas que podrían ser teléfono
-            phone_columns = [col for col in self.df.columns if "TELEFONO" in col or "PHONE" in col or "TEL" in col]
-            for col in phone_columns:
-                if col != "TELEFONO":  # Ya procesamos TELEFONO arriba
-                    self.df[col] = self.df[col].astype(str)
-                    self.df[col] = self.df[col].replace(r'\.0$', '', regex=True)
-            
-            # Continuar con el código existente
-            self.load_data(self.df)
-            print(f"Datos cargados: {len(self.df)} filas")
+            # Una sola lectura: columnas en mayúsculas y teléfonos como texto
+            self.load_data(leer_excel(filename))
         except Exception as e:
             print(f"Error al cargar Excel: {str(e)}")
 
     def load_data(self, df):
-        """Carga los datos en la tabla desde un DataFrame de pandas"""
+        """Muestra un DataFrame en la tabla (sin copiarlo: pasa a ser self.df)"""
         try:
-            # Configurar columnas
-            self.table["columns"] = tuple(df.columns)
-            self.table.column("#0", width=0, stretch=False)  # Ocultar primera columna
-            
-            # Configurar cada columna
-            for col in df.columns:
-                self.table.column(col, anchor="w", width=120)
-                self.table.heading(col, text=col)
-                
-            # Limpiar datos existentes
-            for item in self.table.get_children():
-                self.table.delete(item)
-                
-            # Insertar nuevos datos
-            for _, row in df.iterrows():
-                values = tuple(str(val) for val in row.values)  # Convertir todos los valores a string
-                self.table.insert("", "end", values=values)
-            
+            self.finish_edit(commit=False)
+            self.df = df
+            self.pending_rows = 0
+            self.version += 1
+            self.configure_columns(tuple(df.columns))
+            self.offset = 0
+            self.render_window()
             print(f"Datos cargados: {len(df)} filas")  # Para debugging
-            
+
         except Exception as e:
             print(f"Error en load_data: {str(e)}")  # Para debugging
             raise  # Re-lanzar la excepción para manejo superior
 
+    def ensure_data(self):
+        """Retorna self.df, creando la tabla vacía inicial si hace falta"""
+        if self.df is None:
+            import pandas as pd
+            self.df = pd.DataFrame({DEFAULT_COLUMN: [""]})
+        return self.df
+
+    def configure_columns(self, columns):
+        """Configura los encabezados del Treeview"""
+        self.table["columns"] = columns
+        self.table.column("#0", width=0, stretch=False)  # Ocultar primera columna
+        for col in columns:
+            self.table.column(col, anchor="w", width=120)
+            self.table.heading(col, text=col)
+
+    def row_count(self):
+        """Cantidad de filas de la tabla (incluye las vacías pendientes)"""
+        return (1 if self.df is None else len(self.df)) + self.pending_rows
+
+    def render_window(self):
+        """Muestra en la tabla solo las filas visibles del DataFrame"""
+        self.finish_edit()
+        if self.df is None:
+            return
+        total = self.row_count()
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        end = min(total, self.offset + self.visible_rows)
+
+        self.table.delete(*self.table.get_children())
+        window = self.df.iloc[self.offset:end]
+        for position, values in enumerate(window.itertuples(index=False, name=None), self.offset):
+            # El iid es la posición de la fila en el DataFrame
+            self.table.insert("", "end", iid=str(position), values=format_values(values))
+        empty = ("",) * len(self.df.columns)
+        for position in range(max(self.offset, len(self.df)), end):
+            self.table.insert("", "end", iid=str(position), values=empty)
+
+        if total:
+            self.y_scroll.set(self.offset / total, end / total)
+        else:
+            self.y_scroll.set(0, 1)
+
+    def scroll_to(self, offset):
+        """Mueve la ventana visible a la fila indicada"""
+        if offset != self.offset:
+            self.offset = offset
+            self.render_window()
+
+    def on_virtual_scroll(self, action, amount, unit=None):
+        """Traduce los comandos de la barra vertical a filas del DataFrame"""
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.row_count()))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_to(self.offset + int(amount) * step)
+
+    def on_mousewheel(self, event):
+        """Desplaza la ventana visible con la rueda del mouse"""
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.offset - WHEEL_STEP)
+        else:
+            self.scroll_to(self.offset + WHEEL_STEP)
+        return "break"
+
+    def on_resize(self, event):
+        """Recalcula cuántas filas caben en la tabla"""
+        style = ttk.Style()
+        row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        visible_rows = max(1, event.height // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render_window()
+
+    def get_data(self):
+        """Retorna el DataFrame con las filas que tienen datos
+
+        Si no hay filas vacías se entrega self.df tal cual, sin copiar ni
+        convertir valores (los ceros a la izquierda se conservan).
+        """
+        df = self.ensure_data()
+        filled = non_empty_rows(df)
+        if filled.all():
+            return df
+        return df[filled]
+
+    def get_sample_rows(self, count):
+        """Retorna hasta `count` filas repartidas a lo largo de la tabla
+
+        Cada elemento es (posición, diccionario columna -> valor). Solo se
+        leen las filas de la muestra, no la tabla completa.
+        """
+        if self.df is None or not len(self.df):
+            return []
+        total = len(self.df)
+        count = min(count, total)
+        positions = sorted({position * total // count for position in range(count)})
+        columns = list(self.df.columns)
+        rows = self.df.iloc[positions].itertuples(index=False, name=None)
+        return [
+            (position, dict(zip(columns, format_values(values))))
+            for position, values in zip(positions, rows)
+        ]
+
     def add_empty_row(self):
-        """Agrega una fila vacía al final"""
-        values = [""] * len(self.table["columns"])
-        self.table.insert("", "end", values=values)
+        """Agrega una fila vacía al final
+
+        Es O(1): la fila solo se cuenta y se muestra vacía; entra a self.df
+        cuando se edita (get_data la omitiría de todos modos por vacía).
+        """
+        self.ensure_data()
+        self.finish_edit()
+        self.pending_rows += 1
+        self.offset = self.row_count()
+        self.render_window()
+
+    def materialize_rows(self):
+        """Agrega a self.df las filas vacías pendientes, en una sola copia
+
+        Se concatenan filas con los tipos de cada columna: asignar con
+        df.loc[len(df)] convertiría las columnas numéricas y de fechas en
+        object. Las filas se renumeran (las posiciones son el iid).
+        """
+        if not self.pending_rows:
+            return
+        import pandas as pd
+        df = self.ensure_data()
+        self.df = pd.concat([df, empty_rows(df, self.pending_rows)], ignore_index=True)
+        self.pending_rows = 0
 
     def add_column(self):
         """Agregar nueva columna"""
@@ -115,17 +247,172 @@ class DynamicTable(ctk.CTkFrame):
         )
         column_name = dialog.get_input()
         if column_name:
-            columns = list(self.table["columns"])
-            columns.append(column_name.upper())
-            self.table["columns"] = columns
-            
-            # Reconfigurar todas las columnas
-            for col in columns:
-                self.table.column(col, anchor="w", width=120)
-                self.table.heading(col, text=col)
-                
-            # Actualizar filas existentes con valor vacío para nueva columna
-            for item in self.table.get_children():
-                values = list(self.table.item(item)["values"])
-                values.append("")
-                self.table.item(item, values=values)
\ No newline at end of file
+            column_name = column_name.strip().upper()
+            df = self.ensure_data()
+            if column_name in df.columns:
+                messagebox.showwarning("Columna existente", f"La columna {column_name} ya existe")
+                return
+
+            # Una sola asignación vectorizada en el DataFrame
+            self.finish_edit()
+            df[column_name] = ""
+            self.version += 1
+            self.configure_columns(tuple(df.columns))
+            self.render_window()
+
+    def on_double_click(self, event):
+        """Abre un campo de edición sobre la celda"""
+        item = self.table.identify_row(event.y)
+        column = self.table.identify_column(event.x)
+        if not item or not column or column == "#0":
+            return
+        self.finish_edit()
+
+        df = self.ensure_data()
+        position = int(item)
+        name = self.table["columns"][int(column[1:]) - 1]
+        bbox = self.table.bbox(item, column)
+        if not bbox:
+            return
+
+        x, y, width, height = bbox
+        entry = ttk.Entry(self.table)
+        if position < len(df):
+            entry.insert(0, format_value(df.iat[position, df.columns.get_loc(name)]))
+        entry.select_range(0, "end")
+        entry.place(x=x, y=y, width=width, height=height)
+        entry.focus_set()
+        entry.bind("<Return>", lambda e: self.finish_edit())
+        entry.bind("<Escape>", lambda e: self.finish_edit(commit=False))
+        entry.bind("<FocusOut>", lambda e: self.finish_edit())
+        self.cell_editor = (entry, position, name)
+
+    def finish_edit(self, commit=True):
+        """Cierra el campo de edición y guarda el valor en el DataFrame"""
+        if self.cell_editor is None:
+            return
+        entry, position, name = self.cell_editor
+        self.cell_editor = None
+        value = entry.get()
+        entry.destroy()
+        if commit:
+            self.set_cell(position, name, value)
+
+    def set_cell(self, position, column, value):
+        """Guarda un valor en self.df y actualiza solo esa fila de la vista"""
+        df = self.ensure_data()
+        if position >= len(df):
+            # Fila vacía pendiente: entra a self.df solo si recibe un valor
+            if not value.strip():
+                return
+            self.materialize_rows()
+            df = self.df
+        col = df.columns.get_loc(column)
+        current = df.iat[position, col]
+        if format_value(current) == value:
+            return
+
+        if not is_text_column(df[column]):
+            # Columnas numéricas o de fechas: se conserva el tipo si se puede
+            value = parse_value(df[column], value)
+        try:
+            df.iat[position, col] = value
+        except (TypeError, ValueError):
+            # El valor no cabe en el tipo de la columna (p. ej. 2.5 en una de
+            # enteros o texto en una de fechas): se amplía el tipo y se asigna
+            df[column] = widen_column(df[column], value)
+            df.iat[position, col] = value
+        self.version += 1
+
+        if self.table.exists(str(position)):
+            self.table.item(str(position), values=format_values(df.iloc[position]))
+
+
+def empty_rows(df, count):
+    """DataFrame de `count` filas vacías con los tipos de df: texto vacío en
+    las columnas de texto y nulo en las demás (los enteros y booleanos pasan
+    a sus tipos que admiten nulos, Int64 y boolean)"""
+    import pandas as pd
+    columns = []
+    for position, col in enumerate(df.columns):
+        serie = df.iloc[:, position]
+        if is_text_column(serie):
+            columns.append(pd.Series([""] * count, dtype=serie.dtype, name=col))
+            continue
+        dtype = serie.dtype
+        if not pd.api.types.is_extension_array_dtype(dtype):
+            if dtype.kind == "i":
+                dtype = f"Int{dtype.itemsize * 8}"
+            elif dtype.kind == "u":
+                dtype = f"UInt{dtype.itemsize * 8}"
+            elif dtype.kind == "b":
+                dtype = "boolean"
+        columns.append(pd.Series([None] * count, dtype=dtype, name=col))
+    return pd.concat(columns, axis=1)
+
+
+def is_text_column(serie):
+    """Indica si la columna guarda texto (y no números o fechas)"""
+    import pandas as pd
+    return pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)
+
+
+def parse_value(serie, value):
+    """Convierte el texto editado al tipo de la columna
+
+    Retorna None si quedó vacío y el texto tal cual si no es un número (o
+    una fecha o un booleano, en esas columnas).
+    """
+    import pandas as pd
+    if not value.strip():
+        return None
+    if pd.api.types.is_bool_dtype(serie):
+        return BOOLEAN_VALUES.get(value.strip().lower(), value)
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        parsed = pd.to_datetime(value, errors="coerce")
+    else:
+        parsed = pd.to_numeric(value, errors="coerce")
+    return value if pd.isna(parsed) else parsed
+
+
+def widen_column(serie, value):
+    """Columna con un tipo que admite el valor: booleano con nulos para
+    vaciar una celda booleana, decimal para los números (los enteros pasan
+    a float) y object como último recurso"""
+    import pandas as pd
+    if pd.api.types.is_bool_dtype(serie):
+        if value is None:
+            return serie.astype("boolean")
+        return serie.astype(object)
+    if pd.api.types.is_number(value) and pd.api.types.is_numeric_dtype(serie):
+        dtype = "Float64" if pd.api.types.is_extension_array_dtype(serie) else "float64"
+        try:
+            return serie.astype(dtype)
+        except (TypeError, ValueError):
+            pass
+    return serie.astype(object)
+
+
+def format_value(value):
+    """Texto que muestra la tabla para un valor (vacío para los nulos)"""
+    import pandas as pd
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return ""
+    return str(value)
+
+
+def format_values(values):
+    return tuple(format_value(value) for value in values)
+
+
+def non_empty_rows(df):
+    """Máscara de las filas con al menos un valor (vectorizada por columna)"""
+    import pandas as pd
+    filled = pd.Series(False, index=df.index)
+    for col in df.columns:
+        serie = df[col]
+        if is_text_column(serie):
+            filled |= (serie.notna() & (serie.astype(str).str.strip() != "")).fillna(False).astype(bool)
+        else:
+            filled |= serie.notna()
+    return filled
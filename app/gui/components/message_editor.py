@@ -1,10 +1,27 @@
 import customtkinter as ctk
 import re
 
+# Espera (ms) tras la última tecla antes de renderizar la vista previa
+PREVIEW_DEBOUNCE_MS = 300
+
+# Filas de la tabla (repartidas a lo largo de ella) que recorre la vista previa
+PREVIEW_SAMPLE_ROWS = 5
+
 class MessageEditor(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
-        
+
+        # Plantilla compilada (se reutiliza mientras el texto no cambie)
+        self.template_text = None
+        self.template = None
+
+        # Vista previa renderizada para (plantilla, versión de los datos)
+        self.preview_key = None
+        self.samples = []  # [(fila, texto, es_error)]
+        self.sample_index = 0
+        self.shown = None
+        self.pending_preview = None
+
         # Instrucciones
         instructions = """
         Instrucciones:
@@ -14,54 +31,147 @@ class MessageEditor(ctk.CTkFrame):
         """
         self.instructions = ctk.CTkLabel(self, text=instructions, justify="left")
         self.instructions.pack(fill="x", padx=5, pady=5)
-        
+
         # Editor
         self.editor = ctk.CTkTextbox(self, height=150)
         self.editor.pack(fill="both", expand=True, padx=5, pady=5)
-        
+
         # Preview
         preview_frame = ctk.CTkFrame(self)
         preview_frame.pack(fill="x", padx=5, pady=5)
-        
-        ctk.CTkLabel(preview_frame, text="Vista Previa:").pack(anchor="w")
+
+        # Encabezado con la navegación entre las filas de muestra
+        header = ctk.CTkFrame(preview_frame, fg_color="transparent")
+        header.pack(fill="x")
+        ctk.CTkLabel(header, text="Vista Previa:").pack(side="left")
+        self.next_btn = ctk.CTkButton(header, text="▶", width=28, command=self.next_sample)
+        self.next_btn.pack(side="right")
+        self.sample_label = ctk.CTkLabel(header, text="")
+        self.sample_label.pack(side="right", padx=5)
+        self.prev_btn = ctk.CTkButton(header, text="◀", width=28, command=self.previous_sample)
+        self.prev_btn.pack(side="right")
+
         self.preview = ctk.CTkTextbox(preview_frame, height=100)
         self.preview.pack(fill="x", pady=5)
         self.preview.configure(state="disabled")
-        
-        # Bind para actualizar preview
-        self.editor.bind("<KeyRelease>", self.update_preview)
-        
+
+        # Bind para actualizar preview (cuando el usuario deja de escribir)
+        self.editor.bind("<KeyRelease>", self.schedule_preview)
+
+    def schedule_preview(self, event=None):
+        """Programa la vista previa; cada tecla reinicia la espera"""
+        if self.pending_preview is not None:
+            self.after_cancel(self.pending_preview)
+        self.pending_preview = self.after(PREVIEW_DEBOUNCE_MS, self.update_preview)
+
+    def get_table(self):
+        """Retorna la tabla de datos de la ventana principal (o None)"""
+        return getattr(self.winfo_toplevel(), "table", None)
+
+    def compile_template(self, message):
+        """Compila la plantilla solo si el texto cambió"""
+        if message != self.template_text:
+            # pandas se carga recién al previsualizar con datos
+            from app.utils.message_template import PlantillaMensaje
+            self.template = PlantillaMensaje(message)
+            self.template_text = message
+        return self.template
+
+    def render_samples(self, message, table):
+        """Renderiza las filas de muestra y pone primero la vista en una con error"""
+        # Las filas vacías (como la inicial de la tabla) no se previsualizan
+        rows = [
+            (position, row) for position, row in table.get_sample_rows(PREVIEW_SAMPLE_ROWS)
+            if any(row.values())
+        ]
+        self.samples = []
+        self.sample_index = 0
+        if not rows:
+            return
+
+        try:
+            template = self.compile_template(message)
+        except ValueError as e:
+            self.samples = [(None, f"Error en formato: {str(e)}", True)]
+            return
+
+        # Mismo renderizado que el envío (p. ej. "515693.00" con {DEUDA:,.0f})
+        import pandas as pd
+        sample = pd.DataFrame([row for _, row in rows], index=[position for position, _ in rows])
+        try:
+            messages, errors = template.renderizar_lote(sample)
+        except KeyError as e:
+            missing = str(e).strip("'")
+            self.samples = [(None, f"Error en formato: faltan las columnas {missing}", True)]
+            return
+
+        for position, _ in rows:
+            if position in errors:
+                self.samples.append((position, f"Error en formato: {errors[position]}", True))
+            else:
+                self.samples.append((position, messages[position], False))
+
+        # Las filas con problemas se muestran primero
+        failed = [index for index, (_, _, is_error) in enumerate(self.samples) if is_error]
+        if failed:
+            self.sample_index = failed[0]
+
     def update_preview(self, event=None):
-        """Actualiza la vista previa con datos reales de la primera fila"""
+        """Actualiza la vista previa con datos reales de una muestra de filas
+
+        Solo se vuelve a renderizar si cambió la plantilla o los datos de la
+        tabla; si no, se muestra lo que ya estaba calculado.
+        """
+        self.pending_preview = None
         message = self.editor.get("1.0", "end-1c")
-        
-        try:
-            # Obtener datos de la primera fila de la tabla
-            main_window = self.winfo_toplevel()
-            if hasattr(main_window, 'table'):
-                first_item = main_window.table.table.get_children()[0]
-                if first_item:
-                    values = main_window.table.table.item(first_item)["values"]
-                    columns = main_window.table.table["columns"]
-                    
-                    # Crear diccionario con los datos
-                    preview_data = dict(zip(columns, values))
-                    
-                    # Generar vista previa con datos reales
-                    preview_text = message.format(**preview_data)
-                    
-                    self.preview.configure(state="normal")
-                    self.preview.delete("1.0", "end")
-                    self.preview.insert("1.0", preview_text)
-                    self.preview.configure(state="disabled")
-                else:
-                    self.preview.configure(state="normal")
-                    self.preview.delete("1.0", "end")
-                    self.preview.insert("1.0", "No hay datos para previsualizar")
-                    self.preview.configure(state="disabled")
-            
-        except Exception as e:
-            self.preview.configure(state="normal")
-            self.preview.delete("1.0", "end")
-            self.preview.insert("1.0", f"Error en formato: {str(e)}")
-            self.preview.configure(state="disabled")
\ No newline at end of file
+        table = self.get_table()
+        if table is None:
+            return
+
+        key = (message, table.version)
+        if key != self.preview_key:
+            self.render_samples(message, table)
+            self.preview_key = key
+        self.show_sample()
+
+    def show_sample(self):
+        """Escribe en la vista previa la fila de muestra seleccionada"""
+        if self.samples:
+            position, text, is_error = self.samples[self.sample_index]
+            errors = sum(1 for sample in self.samples if sample[2])
+            label = f"{self.sample_index + 1}/{len(self.samples)}"
+            if position is not None:
+                label = f"Fila {position + 1} · {label}"
+            if errors:
+                label += f" · {errors} con error"
+        else:
+            text = "No hay datos para previsualizar"
+            label = ""
+        self.sample_label.configure(text=label)
+
+        # El cuadro solo se reescribe si cambia el texto mostrado
+        if text == self.shown:
+            return
+        self.shown = text
+        self.preview.configure(state="normal")
+        self.preview.delete("1.0", "end")
+        self.preview.insert("1.0", text)
+        self.preview.configure(state="disabled")
+
+    def next_sample(self):
+        """Muestra la siguiente fila de muestra"""
+        self.move_sample(1)
+
+    def previous_sample(self):
+        """Muestra la fila de muestra anterior"""
+        self.move_sample(-1)
+
+    def move_sample(self, step):
+        """Recorre la muestra en forma circular"""
+        table = self.get_table()
+        if table is not None and self.preview_key != (self.editor.get("1.0", "end-1c"), table.version):
+            # La plantilla o los datos cambiaron desde el último render
+            self.update_preview()
+        elif self.samples:
+            self.sample_index = (self.sample_index + step) % len(self.samples)
+            self.show_sample()
@@ -1,12 +1,26 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-import pandas as pd
 import os
+import queue
 from .components.dynamic_table import DynamicTable
 from .components.message_editor import MessageEditor
 from .components.country_selector import CountrySelector
-from app.core.whatsapp_bot import configurar_navegador, esperar_inicio_sesion, enviar_mensaje, guardar_registro
-from app.core.sms_sender import SMSService
+from app.core.send_journal import DiarioEnvios
+from app.core.campaign_state import IndiceCampana, id_campana
+from app.core.invalid_numbers import CacheNumerosInvalidos
+from app.core.metrics import MetricasEnvio, PUERTO_PROMETHEUS
+
+# pandas, selenium y aiohttp no se importan aquí: se cargan al usarlos por
+# primera vez para que la ventana aparezca de inmediato
+
+# Intervalo (ms) con que la interfaz lee el progreso de la campaña
+CAMPAIGN_POLL_MS = 200
+
+# Intervalo (ms) con que la interfaz lee el avance de la carga del Excel
+EXCEL_POLL_MS = 100
+
+# Filas con error de formato que se listan en el aviso previo al envío
+MAX_ERRORS_SHOWN = 10
 
 
 class MainWindow(ctk.CTk):
@@ -21,8 +35,15 @@ class MainWindow(ctk.CTk):
         self.title("Messaging Automation Pro")
         self.geometry("1200x800")
         
-        # Inicializar variables
-        self.df = None
+        # Inicializar variables (los datos viven en self.table.df)
+        self.campaign = None
+        self.excel_load = None
+        self.data_source = "tabla"  # Origen de los datos (identifica la campaña)
+        
+        # Tiempos por fase de todas las campañas de esta sesión
+        self.metrics = MetricasEnvio()
+        if PUERTO_PROMETHEUS:
+            self.metrics.iniciar_servidor(PUERTO_PROMETHEUS)
         
         # Configurar tema
         self.configure_theme()
@@ -50,6 +71,14 @@ class MainWindow(ctk.CTk):
         )
         self.select_file_btn.pack(side="left", padx=5)
         
+        # Todos los libros de una carpeta (p. ej. data/) en una sola tabla
+        self.select_folder_btn = ctk.CTkButton(
+            file_frame,
+            text="Importar carpeta",
+            command=self.select_excel_folder
+        )
+        self.select_folder_btn.pack(side="left", padx=5)
+        
         self.file_label = ctk.CTkLabel(file_frame, text="No se ha seleccionado archivo")
         self.file_label.pack(side="left", padx=5)
         
@@ -60,6 +89,29 @@ class MainWindow(ctk.CTk):
         self.country_selector = CountrySelector(country_frame)
         self.country_selector.pack(side="left", padx=5)
         
+        # Sesiones paralelas de WhatsApp (una cuenta/perfil por sesión)
+        ctk.CTkLabel(country_frame, text="Sesiones:").pack(side="left", padx=(20, 5))
+        self.sessions_var = ctk.StringVar(value="1")
+        self.sessions_menu = ctk.CTkOptionMenu(
+            country_frame,
+            variable=self.sessions_var,
+            values=[str(n) for n in range(1, 9)],
+            width=70
+        )
+        self.sessions_menu.pack(side="left")
+        
+        ctk.CTkLabel(country_frame, text="Cuota por sesión:").pack(side="left", padx=(20, 5))
+        self.quota_entry = ctk.CTkEntry(country_frame, width=80, placeholder_text="Sin límite")
+        self.quota_entry.pack(side="left")
+        
+        # Chrome sin ventana ni imágenes: menos memoria por sesión
+        self.lean_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            country_frame,
+            text="Modo ligero (sin ventana)",
+            variable=self.lean_var
+        ).pack(side="left", padx=(20, 5))
+        
         # Panel principal
         main_panel = ctk.CTkFrame(self)
         main_panel.pack(fill="both", expand=True, padx=10, pady=5)
@@ -100,31 +152,121 @@ class MainWindow(ctk.CTk):
         )
         self.sms_btn.pack(side="left", padx=5)
         
+        # Progreso de la campaña (visible solo durante el envío)
+        self.progress_frame = ctk.CTkFrame(main_panel)
+        
+        self.progress_bar = ctk.CTkProgressBar(self.progress_frame, width=400)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(side="left", padx=5)
+        
+        self.progress_label = ctk.CTkLabel(self.progress_frame, text="")
+        self.progress_label.pack(side="left", padx=5)
+        
+        self.pause_btn = ctk.CTkButton(
+            self.progress_frame,
+            text="Pausar ⏸",
+            command=self.toggle_pause,
+            width=100
+        )
+        self.pause_btn.pack(side="left", padx=5)
+        
+        self.cancel_btn = ctk.CTkButton(
+            self.progress_frame,
+            text="Cancelar ⏹",
+            command=self.cancel_campaign,
+            width=100,
+            fg_color="#D9534F",
+            hover_color="#C9302C"
+        )
+        self.cancel_btn.pack(side="left", padx=5)
+        
     def select_excel_file(self):
         filename = filedialog.askopenfilename(
             title="Seleccionar archivo Excel",
             filetypes=[("Excel files", "*.xlsx")]
         )
         if filename:
+            from app.utils.excel_loader import CargaExcel
+            
+            # Leer el archivo una sola vez en segundo plano
+            self.start_excel_load(CargaExcel(filename))
+
+    def select_excel_folder(self):
+        folder = filedialog.askdirectory(title="Seleccionar carpeta con archivos Excel")
+        if folder:
+            from app.utils.excel_loader import CargaDirectorio
+            
+            # Los libros se leen en paralelo; los teléfonos repetidos entre
+            # archivos se comparan ya normalizados con el código del país
+            self.start_excel_load(
+                CargaDirectorio(folder, self.country_selector.get_country_code())
+            )
+
+    def start_excel_load(self, load):
+        """Inicia una carga en segundo plano y empieza a leer su avance"""
+        self.select_file_btn.configure(state="disabled")
+        self.select_folder_btn.configure(state="disabled")
+        self.file_label.configure(text=f"Cargando {os.path.basename(load.ruta)}...")
+        self.excel_load = load
+        self.excel_load.start()
+        self.after(EXCEL_POLL_MS, self.poll_excel_load)
+
+    def poll_excel_load(self):
+        """Muestra el avance de la carga y comparte el resultado con la tabla"""
+        name = os.path.basename(self.excel_load.ruta)
+        while True:
             try:
-                # Cargar datos y actualizar interfaz
-                self.df = pd.read_excel(filename)
-                self.file_label.configure(text=os.path.basename(filename))
-                self.table.load_excel(filename)  # Llamada al método de DynamicTable
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al cargar el archivo: {str(e)}")
-                print(f"Error detallado: {e}")  # Para debugging
+                evento = self.excel_load.eventos.get_nowait()
+            except queue.Empty:
+                break
+            
+            if evento["tipo"] == "progreso":
+                if "archivos" in evento:
+                    progress = f"{evento['archivos']}/{evento['total']} archivos"
+                else:
+                    progress = f"{evento['filas']:,} filas"
+                self.file_label.configure(text=f"Cargando {name}... {progress}")
+            elif evento["tipo"] == "fin":
+                self.select_file_btn.configure(state="normal")
+                self.select_folder_btn.configure(state="normal")
+                try:
+                    self.table.load_data(evento["df"])
+                    self.message_editor.schedule_preview()
+                    self.data_source = os.path.abspath(self.excel_load.ruta)
+                    summary = evento.get("resumen")
+                    if summary:
+                        self.file_label.configure(
+                            text=f"{name}: {len(summary['archivos'])} archivos "
+                                 f"({len(evento['df']):,} filas, {summary['duplicados']:,} duplicados omitidos)"
+                        )
+                        if summary["errores"]:
+                            messagebox.showwarning(
+                                "Archivos omitidos",
+                                "No se pudieron leer estos archivos:\n\n" + "\n".join(
+                                    f"{file}: {detail}" for file, detail in summary["errores"].items()
+                                )
+                            )
+                    else:
+                        self.file_label.configure(text=f"{name} ({len(evento['df']):,} filas)")
+                except Exception as e:
+                    self.file_label.configure(text="No se ha seleccionado archivo")
+                    messagebox.showerror("Error", f"Error al cargar el archivo: {str(e)}")
+                return
+            elif evento["tipo"] == "error":
+                self.select_file_btn.configure(state="normal")
+                self.select_folder_btn.configure(state="normal")
+                self.file_label.configure(text="No se ha seleccionado archivo")
+                messagebox.showerror("Error", f"Error al cargar el archivo: {evento['detalle']}")
+                print(f"Error detallado: {evento['detalle']}")  # Para debugging
+                return
+        
+        self.after(EXCEL_POLL_MS, self.poll_excel_load)
 
     def get_message_data(self):
         """Obtiene los datos y el mensaje a enviar"""
-        data = []
-        for item in self.table.table.get_children():
-            values = self.table.table.item(item)["values"]
-            if any(values):  # Solo procesar filas con datos
-                row_dict = dict(zip(self.table.table["columns"], values))
-                data.append(row_dict)
-        
-        if not data:
+        data = self.table.get_data()  # Solo filas con datos, sin copiar la tabla
+        
+        if data.empty:
             messagebox.showerror("Error", "No hay datos para enviar")
             return None, None
             
@@ -137,70 +279,258 @@ class MainWindow(ctk.CTk):
             
     def start_whatsapp_process(self):
         """Inicia el proceso de envío por WhatsApp"""
+        if self.campaign is not None and self.campaign.is_alive():
+            messagebox.showwarning("Campaña en curso", "Ya hay una campaña enviándose")
+            return
+        
         data, message_template = self.get_message_data()
-        if not data or not message_template:
+        if data is None or not message_template:
             return
         
-        if messagebox.askyesno(
+        # Validar y renderizar todos los mensajes antes de abrir el navegador
+        prepared = self.prepare_messages(data, message_template)
+        if prepared is None:
+            return
+        df, messages = prepared
+        
+        # Normalizar teléfonos a E.164 y quitar inválidos/duplicados
+        recipients = self.prepare_recipients(df.loc[messages.index], messages)
+        if recipients is None:
+            return
+        envios, duplicates = recipients
+        
+        # Reanudar: omitir lo ya enviado con la misma hoja y la misma plantilla
+        index = IndiceCampana(id_campana(self.data_source, message_template))
+        pending = index.pendientes(envios)
+        already_sent = len(envios) - len(pending)
+        if already_sent and messagebox.askyesno(
+            "Reanudar campaña",
+            f"{already_sent} de {len(envios)} destinatarios ya recibieron este mensaje " +
+            "en un envío anterior.\n\n" +
+            f"¿Desea reanudar enviando solo a los {len(pending)} pendientes?"
+        ):
+            envios = pending
+            if not envios:
+                index.cerrar()
+                messagebox.showinfo("Completado", "Todos los destinatarios ya recibieron el mensaje")
+                return
+        
+        # Números que WhatsApp ya reportó como inválidos: se omiten sin abrir el chat
+        invalid_numbers = CacheNumerosInvalidos()
+        known_invalid = sum(1 for phone, _ in envios if phone in invalid_numbers.numeros)
+        
+        if not messagebox.askyesno(
             "Confirmar Envío por WhatsApp",
             "¿Está seguro de los datos ingresados?\n\n" +
             "Mensaje a enviar:\n" +
             f"{message_template}\n\n" +
-            f"Total de destinatarios: {len(data)}\n\n" +
+            f"Total de destinatarios: {len(envios)}\n" +
+            (f"Duplicados omitidos: {duplicates}\n" if duplicates else "") +
+            (f"Números inválidos conocidos (se omitirán): {known_invalid}\n" if known_invalid else "") + "\n" +
             "Si está seguro presione 'Sí' para iniciar el envío\n" +
             "Si necesita hacer cambios presione 'No'",
             icon="warning"
         ):
+            index.cerrar()
+            return
+        
+        try:
+            # selenium se carga recién al iniciar la primera campaña
+            from app.core.whatsapp_bot import ARCHIVO_ERRORES
+            from app.core.sending_pool import PoolEnvio, cuentas_predeterminadas
+            from app.core.campaign_runner import CampanaEnvio
+            
+            # Repartir los destinatarios entre las sesiones configuradas
+            pool = PoolEnvio(
+                cuentas_predeterminadas(int(self.sessions_var.get())),
+                cuota_por_sesion=self.get_session_quota(),
+                numeros_invalidos=invalid_numbers,
+                ligero=self.lean_var.get()
+            )
+            
+            # El envío corre en un hilo aparte; la interfaz sigue respondiendo
+            # Cada resultado se agrega al diario apenas termina
+            self.campaign = CampanaEnvio(
+                pool, envios, diario=DiarioEnvios(), ruta_reporte=ARCHIVO_ERRORES, indice=index,
+                metricas=self.metrics
+            )
+            self.campaign.start()
+            self.show_campaign_progress(len(envios))
+            self.after(CAMPAIGN_POLL_MS, self.poll_campaign)
+        except Exception as e:
+            index.cerrar()
+            messagebox.showerror("Error", str(e))
+
+    def prepare_messages(self, df, message_template):
+        """Compila la plantilla, la valida contra las columnas y renderiza
+        todos los mensajes. Retorna (df, mensajes) o None si se cancela."""
+        from app.utils.message_template import PlantillaMensaje
+        
+        try:
+            template = PlantillaMensaje(message_template)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return None
+        
+        missing = template.faltantes(df.columns)
+        if missing:
+            messagebox.showerror(
+                "Error",
+                "Variables no encontradas en los datos: " +
+                ", ".join(f"{{{name}}}" for name in missing)
+            )
+            return None
+        
+        messages, errors = template.renderizar_lote(df)
+        if errors:
+            detail = "\n".join(
+                f"Fila {index + 1}: {reason}"
+                for index, reason in list(errors.items())[:MAX_ERRORS_SHOWN]
+            )
+            if len(errors) > MAX_ERRORS_SHOWN:
+                detail += f"\n... y {len(errors) - MAX_ERRORS_SHOWN} filas más"
+            if messages.empty:
+                messagebox.showerror("Error", f"Ninguna fila se puede renderizar:\n\n{detail}")
+                return None
+            if not messagebox.askyesno(
+                "Errores en el mensaje",
+                f"{len(errors)} filas no se pueden renderizar:\n\n{detail}\n\n" +
+                "¿Desea continuar omitiendo esas filas?",
+                icon="warning"
+            ):
+                return None
+        
+        return df, messages
+
+    def prepare_recipients(self, df, messages):
+        """Normaliza la columna TELEFONO con el código de país seleccionado,
+        descarta números inválidos y duplicados.
+        Retorna ([(telefono, mensaje)], duplicados omitidos) o None."""
+        if "TELEFONO" not in df.columns:
+            messagebox.showerror("Error", "La tabla no tiene la columna TELEFONO")
+            return None
+        
+        from app.utils.phone_normalizer import normalizar_telefonos, deduplicar
+        phones = normalizar_telefonos(df["TELEFONO"], self.country_selector.get_country_code())
+        phones["mensaje"] = messages
+        
+        invalid = phones[~phones["valido"]]
+        if not invalid.empty:
+            detail = "\n".join(
+                f"Fila {index + 1}: {row['telefono']} ({row['motivo']})"
+                for index, row in invalid.head(MAX_ERRORS_SHOWN).iterrows()
+            )
+            if len(invalid) > MAX_ERRORS_SHOWN:
+                detail += f"\n... y {len(invalid) - MAX_ERRORS_SHOWN} filas más"
+            if len(invalid) == len(phones):
+                messagebox.showerror("Error", f"Ningún teléfono es válido:\n\n{detail}")
+                return None
+            if not messagebox.askyesno(
+                "Teléfonos inválidos",
+                f"{len(invalid)} teléfonos no son válidos:\n\n{detail}\n\n" +
+                "¿Desea continuar omitiendo esas filas?",
+                icon="warning"
+            ):
+                return None
+        
+        # Cada número recibe un solo mensaje (la primera fila en que aparece)
+        valid, duplicates = deduplicar(phones[phones["valido"]])
+        return list(zip(valid["telefono"], valid["mensaje"])), duplicates
+
+    def show_campaign_progress(self, total):
+        """Muestra la barra de progreso y bloquea los botones de envío"""
+        self.progress_bar.set(0)
+        self.progress_label.configure(text=f"0/{total} enviados")
+        self.pause_btn.configure(text="Pausar ⏸")
+        self.progress_frame.pack(fill="x", pady=5)
+        self.whatsapp_btn.configure(state="disabled")
+        self.sms_btn.configure(state="disabled")
+
+    def hide_campaign_progress(self):
+        """Oculta la barra de progreso y reactiva los botones de envío"""
+        self.progress_frame.pack_forget()
+        self.whatsapp_btn.configure(state="normal")
+        self.sms_btn.configure(state="normal")
+
+    def poll_campaign(self):
+        """Lee los eventos pendientes de la campaña sin bloquear la interfaz"""
+        campaign = self.campaign
+        while True:
             try:
-                # Obtener el código de país seleccionado
-                country_code = self.country_selector.get_country_code()
-                
-                driver = configurar_navegador()
-                if esperar_inicio_sesion(driver):
-                    registros = []  # Asegurarse que 'registros' está definida antes de cualquier excepción
-                    
-                    for row in data:
-                        telefono = str(row["TELEFONO"]).strip()
-                        
-                        # Eliminar cualquier punto decimal
-                        if telefono.endswith('.0'):
-                            telefono = telefono[:-2]
-                        
-                        # Eliminar cualquier carácter no numérico excepto el +
-                        telefono = ''.join(c for c in telefono if c.isdigit() or c == '+')
-                        
-                        # Verificar si ya tiene código de país o agregarle el seleccionado
-                        if not telefono.startswith('+'):
-                            telefono = f"{country_code}{telefono}"
-                        
-                        try:
-                            mensaje = message_template.format(**row)
-                            registro = enviar_mensaje(driver, telefono, mensaje)
-                            registros.append(registro)
-                        except KeyError as e:
-                            messagebox.showerror(
-                                "Error", 
-                                f"Variable {str(e)} no encontrada en los datos"
-                            )
-                            driver.quit()  # Cerrar el navegador antes de salir
-                            return
-                
-                exitosos = sum(1 for r in registros if r['confirmado'])
-                guardar_registro(registros)
-                messagebox.showinfo(
-                    "Completado",
-                    f"Mensajes enviados: {exitosos}/{len(data)}"
-                )
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
-            finally:
-                if 'driver' in locals():
-                    driver.quit()
+                evento = campaign.eventos.get_nowait()
+            except queue.Empty:
+                break
+            
+            if evento["tipo"] == "progreso":
+                self.update_campaign_progress(evento)
+            elif evento["tipo"] == "fin":
+                self.finish_campaign(evento)
+                return
+            elif evento["tipo"] == "error":
+                self.hide_campaign_progress()
+                messagebox.showerror("Error", evento["detalle"])
+                return
+        
+        self.after(CAMPAIGN_POLL_MS, self.poll_campaign)
+
+    def update_campaign_progress(self, evento):
+        """Actualiza barra, velocidad y tiempo restante"""
+        total = evento["total"]
+        completados = evento["completados"]
+        self.progress_bar.set(completados / total if total else 1)
+        
+        eta = evento["eta_segundos"]
+        eta_text = format_duration(eta) if eta is not None else "--:--:--"
+        self.progress_label.configure(
+            text=f"{completados}/{total} procesados · {evento['exitosos']} exitosos · "
+                 f"{evento['mensajes_por_minuto']:.1f} msj/min · restante {eta_text}"
+        )
+
+    def finish_campaign(self, evento):
+        """Muestra el resumen de la campaña (el diario ya está guardado)"""
+        self.hide_campaign_progress()
+        registros = evento["registros"]
+        exitosos = sum(1 for r in registros if r['confirmado'])
+        
+        titulo = "Cancelado" if evento["cancelada"] else "Completado"
+        messagebox.showinfo(
+            titulo,
+            f"Mensajes enviados: {exitosos}/{len(registros)}"
+        )
+
+    def toggle_pause(self):
+        """Pausa o reanuda la campaña (efectivo entre mensajes)"""
+        if self.campaign is None:
+            return
+        control = self.campaign.control
+        if control.pausada:
+            control.reanudar()
+            self.pause_btn.configure(text="Pausar ⏸")
+        else:
+            control.pausar()
+            self.pause_btn.configure(text="Reanudar ▶")
+
+    def cancel_campaign(self):
+        """Cancela la campaña después del mensaje en curso"""
+        if self.campaign is None:
+            return
+        if messagebox.askyesno("Cancelar campaña", "¿Desea detener el envío?"):
+            self.campaign.control.cancelar()
+            self.progress_label.configure(text="Cancelando...")
+
+    def get_session_quota(self):
+        """Retorna la cuota de mensajes por sesión (None = sin límite)"""
+        value = self.quota_entry.get().strip()
+        if not value:
+            return None
+        if not value.isdigit() or int(value) < 1:
+            raise ValueError("La cuota por sesión debe ser un número entero positivo")
+        return int(value)
 
     def start_sms_process(self):
         """Inicia el proceso de envío por SMS"""
         data, message_template = self.get_message_data()
-        if not data or not message_template:
+        if data is None or not message_template:
             return
         
         if messagebox.askyesno(
@@ -223,4 +553,10 @@ class MainWindow(ctk.CTk):
                     "Por favor, use la opción de WhatsApp por ahora."
                 )
             except Exception as e:
-                messagebox.showerror("Error", str(e))
\ No newline at end of file
+                messagebox.showerror("Error", str(e))
+
+
+def format_duration(seconds):
+    """Formatea segundos como h:mm:ss"""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
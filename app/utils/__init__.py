@@ -0,0 +1,34 @@
+from importlib import import_module
+
+# Nombre exportado -> submódulo que lo define. Se importan al primer uso
+# (PEP 562) para que importar app.utils no cargue pandas.
+_EXPORTACIONES = {
+    'leer_excel': 'excel_loader',
+    'CargaExcel': 'excel_loader',
+    'cargar_directorio': 'excel_loader',
+    'CargaDirectorio': 'excel_loader',
+    'CacheLibros': 'workbook_cache',
+    'CACHE_LIBROS': 'workbook_cache',
+    'PlantillaMensaje': 'message_template',
+    'normalizar_telefonos': 'phone_normalizer',
+    'limpiar_telefonos': 'phone_normalizer',
+    'deduplicar': 'phone_normalizer',
+    'PAISES': 'country_codes',
+    'IndicePaises': 'country_codes',
+    'INDICE_PAISES': 'country_codes',
+}
+
+__all__ = list(_EXPORTACIONES)
+
+
+def __getattr__(nombre):
+    modulo = _EXPORTACIONES.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(import_module(f".{modulo}", __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
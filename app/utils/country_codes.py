@@ -0,0 +1,315 @@
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Países y territorios con su código telefónico internacional (UIT-T E.164).
+# Los países del Plan de Numeración de Norteamérica comparten el +1.
+PAISES: Tuple[Tuple[str, str], ...] = (
+    ("Afganistán", "+93"),
+    ("Albania", "+355"),
+    ("Alemania", "+49"),
+    ("Andorra", "+376"),
+    ("Angola", "+244"),
+    ("Anguila", "+1"),
+    ("Antigua y Barbuda", "+1"),
+    ("Arabia Saudita", "+966"),
+    ("Argelia", "+213"),
+    ("Argentina", "+54"),
+    ("Armenia", "+374"),
+    ("Aruba", "+297"),
+    ("Australia", "+61"),
+    ("Austria", "+43"),
+    ("Azerbaiyán", "+994"),
+    ("Bahamas", "+1"),
+    ("Bangladés", "+880"),
+    ("Barbados", "+1"),
+    ("Baréin", "+973"),
+    ("Bélgica", "+32"),
+    ("Belice", "+501"),
+    ("Benín", "+229"),
+    ("Bermudas", "+1"),
+    ("Bielorrusia", "+375"),
+    ("Bolivia", "+591"),
+    ("Bonaire, San Eustaquio y Saba", "+599"),
+    ("Bosnia y Herzegovina", "+387"),
+    ("Botsuana", "+267"),
+    ("Brasil", "+55"),
+    ("Brunéi", "+673"),
+    ("Bulgaria", "+359"),
+    ("Burkina Faso", "+226"),
+    ("Burundi", "+257"),
+    ("Bután", "+975"),
+    ("Cabo Verde", "+238"),
+    ("Camboya", "+855"),
+    ("Camerún", "+237"),
+    ("Canadá", "+1"),
+    ("Catar", "+974"),
+    ("Chad", "+235"),
+    ("Chequia", "+420"),
+    ("Chile", "+56"),
+    ("China", "+86"),
+    ("Chipre", "+357"),
+    ("Ciudad del Vaticano", "+379"),
+    ("Colombia", "+57"),
+    ("Comoras", "+269"),
+    ("Congo", "+242"),
+    ("Corea del Norte", "+850"),
+    ("Corea del Sur", "+82"),
+    ("Costa de Marfil", "+225"),
+    ("Costa Rica", "+506"),
+    ("Croacia", "+385"),
+    ("Cuba", "+53"),
+    ("Curazao", "+599"),
+    ("Dinamarca", "+45"),
+    ("Dominica", "+1"),
+    ("Ecuador", "+593"),
+    ("Egipto", "+20"),
+    ("El Salvador", "+503"),
+    ("Emiratos Árabes Unidos", "+971"),
+    ("Eritrea", "+291"),
+    ("Eslovaquia", "+421"),
+    ("Eslovenia", "+386"),
+    ("España", "+34"),
+    ("Estados Unidos", "+1"),
+    ("Estonia", "+372"),
+    ("Esuatini", "+268"),
+    ("Etiopía", "+251"),
+    ("Filipinas", "+63"),
+    ("Finlandia", "+358"),
+    ("Fiyi", "+679"),
+    ("Francia", "+33"),
+    ("Gabón", "+241"),
+    ("Gambia", "+220"),
+    ("Georgia", "+995"),
+    ("Ghana", "+233"),
+    ("Gibraltar", "+350"),
+    ("Granada", "+1"),
+    ("Grecia", "+30"),
+    ("Groenlandia", "+299"),
+    ("Guadalupe", "+590"),
+    ("Guam", "+1"),
+    ("Guatemala", "+502"),
+    ("Guayana Francesa", "+594"),
+    ("Guernsey", "+44"),
+    ("Guinea", "+224"),
+    ("Guinea Ecuatorial", "+240"),
+    ("Guinea-Bisáu", "+245"),
+    ("Guyana", "+592"),
+    ("Haití", "+509"),
+    ("Honduras", "+504"),
+    ("Hong Kong", "+852"),
+    ("Hungría", "+36"),
+    ("India", "+91"),
+    ("Indonesia", "+62"),
+    ("Irak", "+964"),
+    ("Irán", "+98"),
+    ("Irlanda", "+353"),
+    ("Isla de Man", "+44"),
+    ("Isla de Navidad", "+61"),
+    ("Isla Norfolk", "+672"),
+    ("Islandia", "+354"),
+    ("Islas Caimán", "+1"),
+    ("Islas Cocos", "+61"),
+    ("Islas Cook", "+682"),
+    ("Islas Feroe", "+298"),
+    ("Islas Malvinas", "+500"),
+    ("Islas Marianas del Norte", "+1"),
+    ("Islas Marshall", "+692"),
+    ("Islas Salomón", "+677"),
+    ("Islas Turcas y Caicos", "+1"),
+    ("Islas Vírgenes Británicas", "+1"),
+    ("Islas Vírgenes de los Estados Unidos", "+1"),
+    ("Israel", "+972"),
+    ("Italia", "+39"),
+    ("Jamaica", "+1"),
+    ("Japón", "+81"),
+    ("Jersey", "+44"),
+    ("Jordania", "+962"),
+    ("Kazajistán", "+7"),
+    ("Kenia", "+254"),
+    ("Kirguistán", "+996"),
+    ("Kiribati", "+686"),
+    ("Kosovo", "+383"),
+    ("Kuwait", "+965"),
+    ("Laos", "+856"),
+    ("Lesoto", "+266"),
+    ("Letonia", "+371"),
+    ("Líbano", "+961"),
+    ("Liberia", "+231"),
+    ("Libia", "+218"),
+    ("Liechtenstein", "+423"),
+    ("Lituania", "+370"),
+    ("Luxemburgo", "+352"),
+    ("Macao", "+853"),
+    ("Macedonia del Norte", "+389"),
+    ("Madagascar", "+261"),
+    ("Malasia", "+60"),
+    ("Malaui", "+265"),
+    ("Maldivas", "+960"),
+    ("Malí", "+223"),
+    ("Malta", "+356"),
+    ("Marruecos", "+212"),
+    ("Martinica", "+596"),
+    ("Mauricio", "+230"),
+    ("Mauritania", "+222"),
+    ("Mayotte", "+262"),
+    ("México", "+52"),
+    ("Micronesia", "+691"),
+    ("Moldavia", "+373"),
+    ("Mónaco", "+377"),
+    ("Mongolia", "+976"),
+    ("Montenegro", "+382"),
+    ("Montserrat", "+1"),
+    ("Mozambique", "+258"),
+    ("Myanmar", "+95"),
+    ("Namibia", "+264"),
+    ("Nauru", "+674"),
+    ("Nepal", "+977"),
+    ("Nicaragua", "+505"),
+    ("Níger", "+227"),
+    ("Nigeria", "+234"),
+    ("Niue", "+683"),
+    ("Noruega", "+47"),
+    ("Nueva Caledonia", "+687"),
+    ("Nueva Zelanda", "+64"),
+    ("Omán", "+968"),
+    ("Países Bajos", "+31"),
+    ("Pakistán", "+92"),
+    ("Palaos", "+680"),
+    ("Palestina", "+970"),
+    ("Panamá", "+507"),
+    ("Papúa Nueva Guinea", "+675"),
+    ("Paraguay", "+595"),
+    ("Perú", "+51"),
+    ("Polinesia Francesa", "+689"),
+    ("Polonia", "+48"),
+    ("Portugal", "+351"),
+    ("Puerto Rico", "+1"),
+    ("Reino Unido", "+44"),
+    ("República Centroafricana", "+236"),
+    ("República Democrática del Congo", "+243"),
+    ("República Dominicana", "+1"),
+    ("Reunión", "+262"),
+    ("Ruanda", "+250"),
+    ("Rumania", "+40"),
+    ("Rusia", "+7"),
+    ("Sáhara Occidental", "+212"),
+    ("Samoa", "+685"),
+    ("Samoa Americana", "+1"),
+    ("San Bartolomé", "+590"),
+    ("San Cristóbal y Nieves", "+1"),
+    ("San Marino", "+378"),
+    ("San Martín (Francia)", "+590"),
+    ("San Martín (Países Bajos)", "+1"),
+    ("San Pedro y Miquelón", "+508"),
+    ("San Vicente y las Granadinas", "+1"),
+    ("Santa Elena", "+290"),
+    ("Santa Lucía", "+1"),
+    ("Santo Tomé y Príncipe", "+239"),
+    ("Senegal", "+221"),
+    ("Serbia", "+381"),
+    ("Seychelles", "+248"),
+    ("Sierra Leona", "+232"),
+    ("Singapur", "+65"),
+    ("Siria", "+963"),
+    ("Somalia", "+252"),
+    ("Sri Lanka", "+94"),
+    ("Sudáfrica", "+27"),
+    ("Sudán", "+249"),
+    ("Sudán del Sur", "+211"),
+    ("Suecia", "+46"),
+    ("Suiza", "+41"),
+    ("Surinam", "+597"),
+    ("Svalbard y Jan Mayen", "+47"),
+    ("Tailandia", "+66"),
+    ("Taiwán", "+886"),
+    ("Tanzania", "+255"),
+    ("Tayikistán", "+992"),
+    ("Timor Oriental", "+670"),
+    ("Togo", "+228"),
+    ("Tokelau", "+690"),
+    ("Tonga", "+676"),
+    ("Trinidad y Tobago", "+1"),
+    ("Túnez", "+216"),
+    ("Turkmenistán", "+993"),
+    ("Turquía", "+90"),
+    ("Tuvalu", "+688"),
+    ("Ucrania", "+380"),
+    ("Uganda", "+256"),
+    ("Uruguay", "+598"),
+    ("Uzbekistán", "+998"),
+    ("Vanuatu", "+678"),
+    ("Venezuela", "+58"),
+    ("Vietnam", "+84"),
+    ("Wallis y Futuna", "+681"),
+    ("Yemen", "+967"),
+    ("Yibuti", "+253"),
+    ("Zambia", "+260"),
+    ("Zimbabue", "+263"),
+)
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas y sin tildes: 'Perú' -> 'peru', 'MÉXICO' -> 'mexico'"""
+    descompuesto = unicodedata.normalize("NFKD", texto.strip().lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+class IndicePaises:
+    """Índice de búsqueda sobre la tabla de países
+
+    Busca por prefijo de las palabras del nombre, sin distinguir tildes ni
+    mayúsculas ("peru", "rep dom"), y por prefijo del código ("57", "+59").
+    Las claves se ordenan una sola vez y cada consulta es una búsqueda binaria.
+    """
+
+    def __init__(self, paises: Sequence[Tuple[str, str]] = PAISES):
+        self.paises: List[Dict[str, str]] = [
+            {"name": nombre, "code": codigo} for nombre, codigo in paises
+        ]
+        self._palabras: List[List[str]] = []
+        claves_nombre = []
+        claves_codigo = []
+        for posicion, pais in enumerate(self.paises):
+            normalizado = normalizar_texto(pais["name"])
+            palabras = normalizado.replace("(", " ").replace(")", " ").replace("-", " ").replace(",", " ").split()
+            self._palabras.append(palabras)
+            claves_nombre.extend((palabra, posicion) for palabra in palabras)
+            claves_codigo.append((pais["code"].lstrip("+"), posicion))
+        self._claves_nombre = sorted(set(claves_nombre))
+        self._claves_codigo = sorted(claves_codigo)
+
+    @staticmethod
+    def _con_prefijo(claves: List[Tuple[str, int]], prefijo: str) -> List[int]:
+        """Posiciones cuyas claves empiezan por el prefijo (búsqueda binaria)"""
+        posiciones = []
+        for clave, posicion in claves[bisect_left(claves, (prefijo, -1)):]:
+            if not clave.startswith(prefijo):
+                break
+            posiciones.append(posicion)
+        return posiciones
+
+    def buscar(self, texto: str) -> List[Dict[str, str]]:
+        """Países que coinciden, en orden alfabético (todos si no hay texto)"""
+        consulta = normalizar_texto(texto)
+        if not consulta:
+            return list(self.paises)
+
+        digitos = consulta.lstrip("+")
+        if digitos.isdigit():
+            encontrados = set(self._con_prefijo(self._claves_codigo, digitos))
+        else:
+            primera, *resto = consulta.split()
+            encontrados = {
+                posicion for posicion in self._con_prefijo(self._claves_nombre, primera)
+                # Cada palabra adicional debe ser prefijo de alguna palabra del nombre
+                if all(
+                    any(palabra.startswith(parte) for palabra in self._palabras[posicion])
+                    for parte in resto
+                )
+            }
+        return [self.paises[posicion] for posicion in sorted(encontrados)]
+
+
+# Índice compartido: se construye una sola vez al importar el módulo
+INDICE_PAISES = IndicePaises()
@@ -0,0 +1,313 @@
+import glob
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from .phone_normalizer import limpiar_telefonos, normalizar_telefonos
+from .workbook_cache import CACHE_LIBROS
+
+# Filas que se convierten a DataFrame de una vez mientras se lee el archivo
+TAMANO_BLOQUE = 5000
+
+# Columna con el nombre del archivo de origen de cada fila (cargar_directorio)
+COLUMNA_ORIGEN = "ORIGEN"
+
+# Procesos para leer varios libros a la vez (None = todos los núcleos)
+PROCESOS_CARGA = None
+
+# Por debajo de este tamaño total (bytes) los libros se leen en este mismo
+# proceso: iniciar procesos nuevos tarda más que leerlos
+TAMANO_MINIMO_PARALELO = 2 * 1024 * 1024
+
+
+def normalizar_columnas(encabezado: Sequence) -> List[str]:
+    """Pasa los nombres de columna a mayúsculas (igual que load_excel)
+
+    Las columnas sin nombre quedan como UNNAMED: N y los duplicados
+    reciben un sufijo .1, .2, ... como hace pandas.
+    """
+    columnas = []
+    vistos: Dict[str, int] = {}
+    for posicion, nombre in enumerate(encabezado):
+        if nombre is None or str(nombre).strip() == "":
+            nombre = f"UNNAMED: {posicion}"
+        nombre = str(nombre).strip().upper()
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}.{vistos[nombre]}"
+        else:
+            vistos[nombre] = 0
+        columnas.append(nombre)
+    return columnas
+
+
+def es_columna_telefono(columna: str) -> bool:
+    """Indica si una columna contiene números de teléfono"""
+    return "TELEFONO" in columna or "PHONE" in columna or "TEL" in columna
+
+
+def _bloque_a_dataframe(filas: List[tuple], columnas: List[str]) -> pd.DataFrame:
+    """Convierte un bloque de filas en DataFrame con teléfonos como texto"""
+    ancho = len(columnas)
+    filas = [
+        fila[:ancho] if len(fila) >= ancho else fila + (None,) * (ancho - len(fila))
+        for fila in filas
+    ]
+    bloque = pd.DataFrame.from_records(filas, columns=columnas)
+    for columna in columnas:
+        if es_columna_telefono(columna):
+            bloque[columna] = limpiar_telefonos(bloque[columna])
+    return bloque
+
+
+def _ajustar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """Descarta columnas vacías sin nombre y convierte a número las columnas
+    de texto numérico (como pd.read_excel), salvo las de teléfono"""
+    vacias = [
+        c for c in df.columns
+        if c.startswith("UNNAMED: ") and df[c].isna().all()
+    ]
+    if vacias:
+        df = df.drop(columns=vacias)
+
+    for columna in df.columns:
+        serie = df[columna]
+        if (es_columna_telefono(columna) or pd.api.types.is_numeric_dtype(serie)
+                or pd.api.types.is_datetime64_any_dtype(serie)):
+            continue
+        valores = serie.replace("", None)
+        if _tiene_ceros_iniciales(valores):
+            # Cédulas y códigos guardados como texto ("0123"): se conservan
+            continue
+        numeros = pd.to_numeric(valores, errors="coerce")
+        if numeros.notna().sum() == valores.notna().sum() and numeros.notna().any():
+            df[columna] = numeros
+    return df
+
+
+def _tiene_ceros_iniciales(valores: pd.Series) -> bool:
+    """Indica si algún valor es texto numérico con ceros a la izquierda"""
+    textos = valores.dropna().astype(str).str.strip()
+    return bool(textos.str.match(r"^0\d").any())
+
+
+def _filas_no_vacias(filas: Iterable[tuple]) -> Iterable[tuple]:
+    for fila in filas:
+        if any(v is not None and v != "" for v in fila):
+            yield fila
+
+
+def leer_excel(
+    ruta: str,
+    tamano_bloque: int = TAMANO_BLOQUE,
+    al_progresar: Optional[Callable[[int], None]] = None,
+    usar_cache: bool = True
+) -> pd.DataFrame:
+    """Lee la primera hoja de un Excel en una sola pasada
+
+    Usa openpyxl en modo solo lectura y arma el DataFrame por bloques, así
+    la memoria durante la lectura no depende del tamaño del archivo.
+    Las columnas quedan en mayúsculas y las de teléfono como texto.
+    al_progresar(filas_leidas) se llama después de cada bloque.
+
+    Con usar_cache, un libro que ya se leyó (mismo contenido) se toma de
+    la caché de libros (ver workbook_cache) sin volver a analizarlo.
+    """
+    if usar_cache:
+        df = CACHE_LIBROS.leer(ruta)
+        if df is not None:
+            if al_progresar:
+                al_progresar(len(df))
+            return df
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return pd.DataFrame()
+        columnas = normalizar_columnas(encabezado)
+
+        bloques = []
+        pendientes: List[tuple] = []
+        leidas = 0
+        for fila in _filas_no_vacias(filas):
+            pendientes.append(fila)
+            if len(pendientes) >= tamano_bloque:
+                bloques.append(_bloque_a_dataframe(pendientes, columnas))
+                leidas += len(pendientes)
+                pendientes = []
+                if al_progresar:
+                    al_progresar(leidas)
+
+        if pendientes or not bloques:
+            bloques.append(_bloque_a_dataframe(pendientes, columnas))
+            leidas += len(pendientes)
+            if al_progresar:
+                al_progresar(leidas)
+    finally:
+        libro.close()
+
+    df = pd.concat(bloques, ignore_index=True) if len(bloques) > 1 else bloques[0]
+    df = _ajustar_tipos(df)
+    if usar_cache:
+        CACHE_LIBROS.guardar(ruta, df)
+    return df
+
+
+class CargaExcel(threading.Thread):
+    """Lee un Excel en segundo plano y publica el avance en `self.eventos`
+
+    Eventos: {"tipo": "progreso", "filas": n}, {"tipo": "fin", "df": df} o
+    {"tipo": "error", "detalle": texto}. La interfaz los lee con `after()`.
+    """
+
+    def __init__(self, ruta: str):
+        super().__init__(daemon=True)
+        self.ruta = ruta
+        self.eventos: "queue.Queue[Dict]" = queue.Queue()
+
+    def run(self) -> None:
+        try:
+            df = leer_excel(
+                self.ruta,
+                al_progresar=lambda n: self.eventos.put({"tipo": "progreso", "filas": n})
+            )
+            self.eventos.put({"tipo": "fin", "df": df})
+        except Exception as e:
+            self.eventos.put({"tipo": "error", "detalle": str(e)})
+
+
+def archivos_excel(patron: str) -> List[str]:
+    """Libros que corresponden a una carpeta o a un patrón ("data/*.xlsx")
+
+    Se omiten los archivos temporales de Excel (~$...). Orden alfabético.
+    """
+    if os.path.isdir(patron):
+        patron = os.path.join(patron, "*.xlsx")
+    return sorted(
+        ruta for ruta in glob.glob(patron)
+        if os.path.isfile(ruta) and not os.path.basename(ruta).startswith("~$")
+    )
+
+
+def cargar_directorio(
+    patron: str,
+    codigo_pais: Optional[str] = "+57",
+    procesos: Optional[int] = PROCESOS_CARGA,
+    al_progresar: Optional[Callable[[int, int], None]] = None
+) -> Tuple[pd.DataFrame, Dict]:
+    """Lee todos los libros de una carpeta (o patrón) y los une en una tabla
+
+    Cada libro se lee con leer_excel en un proceso aparte, así que las
+    columnas quedan en mayúsculas como en la carga individual. La columna
+    ORIGEN indica el archivo de cada fila y los teléfonos repetidos entre
+    archivos se eliminan (queda la primera aparición, en orden alfabético
+    de archivo). al_progresar(leidos, total) se llama al terminar cada libro.
+
+    Retorna (df, resumen) con resumen = {"archivos": {nombre: filas},
+    "errores": {nombre: detalle}, "duplicados": n}.
+    """
+    rutas = archivos_excel(patron)
+    if not rutas:
+        raise FileNotFoundError(f"No hay archivos .xlsx en {patron}")
+
+    tablas: Dict[str, pd.DataFrame] = {}
+    errores: Dict[str, str] = {}
+    tamano_total = sum(os.path.getsize(ruta) for ruta in rutas)
+    if len(rutas) == 1 or procesos == 1 or tamano_total < TAMANO_MINIMO_PARALELO:
+        for leidos, ruta in enumerate(rutas, 1):
+            try:
+                tablas[ruta] = leer_excel(ruta)
+            except Exception as e:
+                errores[os.path.basename(ruta)] = str(e)
+            if al_progresar:
+                al_progresar(leidos, len(rutas))
+    else:
+        trabajadores = min(len(rutas), procesos or os.cpu_count() or 1)
+        # "spawn": se llama desde un hilo de la interfaz y hacer fork de un
+        # proceso con hilos y Tcl activos puede bloquear o romper los hijos
+        with ProcessPoolExecutor(
+            max_workers=trabajadores, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futuros = {pool.submit(leer_excel, ruta): ruta for ruta in rutas}
+            for leidos, futuro in enumerate(as_completed(futuros), 1):
+                ruta = futuros[futuro]
+                try:
+                    tablas[ruta] = futuro.result()
+                except Exception as e:
+                    errores[os.path.basename(ruta)] = str(e)
+                if al_progresar:
+                    al_progresar(leidos, len(rutas))
+
+    if not tablas:
+        raise ValueError("No se pudo leer ningún archivo: " + "; ".join(
+            f"{nombre}: {detalle}" for nombre, detalle in errores.items()
+        ))
+
+    # Mismo orden que los archivos, sin importar cuál terminó primero
+    partes = []
+    for ruta in rutas:
+        if ruta in tablas:
+            partes.append(tablas[ruta].assign(**{COLUMNA_ORIGEN: os.path.basename(ruta)}))
+    df = pd.concat(partes, ignore_index=True, sort=False)
+    df[COLUMNA_ORIGEN] = df.pop(COLUMNA_ORIGEN)  # Al final de la tabla
+
+    # Las columnas que faltan en algunos libros quedan vacías
+    for columna in df.columns:
+        serie = df[columna]
+        if not (pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie)):
+            df[columna] = serie.where(serie.notna(), "")
+
+    duplicados = 0
+    if "TELEFONO" in df.columns:
+        # Mismo número en distintos formatos (+57..., 300...) cuenta como repetido
+        telefonos = normalizar_telefonos(df["TELEFONO"], codigo_pais)
+        validos = telefonos["valido"]
+        repetidos = validos & telefonos["telefono"].where(validos).duplicated(keep="first")
+        duplicados = int(repetidos.sum())
+        if duplicados:
+            df = df[~repetidos].reset_index(drop=True)
+
+    resumen = {
+        "archivos": {
+            os.path.basename(ruta): len(tablas[ruta]) for ruta in rutas if ruta in tablas
+        },
+        "errores": errores,
+        "duplicados": duplicados,
+    }
+    return df, resumen
+
+
+class CargaDirectorio(threading.Thread):
+    """Lee una carpeta de libros en segundo plano (ver cargar_directorio)
+
+    Publica en `self.eventos` los mismos eventos que CargaExcel; el de
+    progreso trae {"archivos": leidos, "total": n} y el de fin incluye
+    además el "resumen".
+    """
+
+    def __init__(self, ruta: str, codigo_pais: Optional[str] = "+57"):
+        super().__init__(daemon=True)
+        self.ruta = ruta
+        self.codigo_pais = codigo_pais
+        self.eventos: "queue.Queue[Dict]" = queue.Queue()
+
+    def run(self) -> None:
+        try:
+            df, resumen = cargar_directorio(
+                self.ruta,
+                codigo_pais=self.codigo_pais,
+                al_progresar=lambda leidos, total: self.eventos.put(
+                    {"tipo": "progreso", "archivos": leidos, "total": total}
+                )
+            )
+            self.eventos.put({"tipo": "fin", "df": df, "resumen": resumen})
+        except Exception as e:
+            self.eventos.put({"tipo": "error", "detalle": str(e)})
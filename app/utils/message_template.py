@@ -0,0 +1,138 @@
+import string
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+# Tipos de formato que requieren un valor numérico ({deuda:,.0f}, {n:d}, ...)
+TIPOS_NUMERICOS = set("bcdeEfFgGnoxX%")
+TIPOS_ENTEROS = set("bcdoxX")
+
+
+def _es_formato_numerico(formato: str) -> bool:
+    return bool(formato) and (formato[-1] in TIPOS_NUMERICOS or "," in formato or "_" in formato)
+
+
+class PlantillaMensaje:
+    """Plantilla de mensaje compilada una sola vez
+
+    Analiza los {CAMPOS} de la plantilla para validarlos contra las columnas
+    de la tabla antes de enviar y renderiza todos los mensajes columna por
+    columna en vez de llamar a str.format fila por fila.
+    """
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        # Partes: (texto literal, campo, conversión, formato)
+        self.partes: List[Tuple[str, str, str, str]] = []
+        # Los campos con atributos/índices ({a.b}, {a[0]}) o formatos
+        # anidados se renderizan con str.format fila por fila
+        self.simple = True
+
+        try:
+            analizadas = list(string.Formatter().parse(texto))
+        except ValueError as e:
+            raise ValueError(f"Plantilla mal formada: {str(e)}")
+
+        campos = []
+        for literal, campo, formato, conversion in analizadas:
+            if campo is not None:
+                raiz = campo.split(".")[0].split("[")[0]
+                if raiz == "" or raiz.isdigit():
+                    raise ValueError("Las variables deben tener nombre, por ejemplo {NOMBRE}")
+                if raiz != campo or "{" in (formato or ""):
+                    self.simple = False
+                if raiz not in campos:
+                    campos.append(raiz)
+            self.partes.append((literal, campo, conversion, formato or ""))
+        self.campos = campos
+
+    def faltantes(self, columnas: Iterable[str]) -> List[str]:
+        """Retorna las variables de la plantilla que no existen en los datos"""
+        disponibles = set(columnas)
+        return [campo for campo in self.campos if campo not in disponibles]
+
+    def renderizar(self, fila: Dict) -> str:
+        """Renderiza el mensaje de una sola fila (vista previa)"""
+        return self.texto.format(**fila)
+
+    def renderizar_lote(self, df: pd.DataFrame) -> Tuple[pd.Series, Dict]:
+        """Renderiza los mensajes de todas las filas del DataFrame
+
+        Retorna (mensajes, errores): `mensajes` es una Serie con el índice de
+        las filas que se pudieron renderizar y `errores` un diccionario
+        {índice: motivo} con todas las filas que fallarían.
+        """
+        faltantes = self.faltantes(df.columns)
+        if faltantes:
+            raise KeyError(", ".join(faltantes))
+
+        if not self.simple:
+            return self._renderizar_por_fila(df)
+
+        errores: Dict = {}
+        resultado = pd.Series("", index=df.index, dtype=object)
+        for literal, campo, conversion, formato in self.partes:
+            if literal:
+                resultado = resultado + literal
+            if campo is not None:
+                resultado = resultado + self._renderizar_columna(
+                    df[campo], campo, conversion, formato, errores
+                )
+
+        if errores:
+            resultado = resultado.drop(index=list(errores))
+        return resultado, errores
+
+    def _renderizar_columna(self, serie, campo, conversion, formato, errores) -> pd.Series:
+        """Convierte una columna completa al texto que iría en el mensaje"""
+        if conversion == "r":
+            serie = serie.map(repr)
+        elif conversion == "a":
+            serie = serie.map(ascii)
+        elif conversion == "s":
+            serie = serie.map(str)
+
+        if not formato:
+            # Conversión en bloque con NumPy: mismo texto que str(valor)
+            textos = serie.to_numpy(dtype=object).astype(str).astype(object)
+            return pd.Series(textos, index=serie.index, dtype=object)
+
+        if _es_formato_numerico(formato) and not conversion:
+            # Los datos de la tabla pueden venir como texto ("515693.00")
+            numeros = pd.to_numeric(serie, errors="coerce")
+            invalidos = numeros.isna()
+            for indice in serie.index[invalidos]:
+                errores.setdefault(indice, f"{campo}: '{serie[indice]}' no es un número")
+            if formato[-1] in TIPOS_ENTEROS:
+                enteros = numeros.where(numeros.isna() | (numeros % 1 == 0))
+                for indice in serie.index[enteros.isna() & ~invalidos]:
+                    errores.setdefault(indice, f"{campo}: '{serie[indice]}' no es un número entero")
+                numeros = enteros
+            serie = numeros
+
+        def formatear(indice, valor):
+            if indice in errores:
+                return ""
+            try:
+                if formato[-1:] in TIPOS_ENTEROS and isinstance(valor, float):
+                    valor = int(valor)
+                return format(valor, formato)
+            except (ValueError, TypeError) as e:
+                errores[indice] = f"{campo}: {str(e)}"
+                return ""
+
+        return pd.Series(
+            [formatear(i, v) for i, v in zip(serie.index, serie)],
+            index=serie.index, dtype=object
+        )
+
+    def _renderizar_por_fila(self, df: pd.DataFrame) -> Tuple[pd.Series, Dict]:
+        """Renderizado fila por fila para plantillas con campos compuestos"""
+        mensajes = {}
+        errores = {}
+        for indice, fila in zip(df.index, df.to_dict("records")):
+            try:
+                mensajes[indice] = self.renderizar(fila)
+            except (KeyError, IndexError, AttributeError, ValueError, TypeError) as e:
+                errores[indice] = str(e)
+        return pd.Series(mensajes, dtype=object), errores
@@ -0,0 +1,99 @@
+from typing import Optional, Tuple
+
+import pandas as pd
+
+# Longitud (mínima, máxima) del número nacional, sin el código de país
+LONGITUDES_NACIONALES = {
+    "1": (10, 10),     # Estados Unidos, Canadá, República Dominicana
+    "34": (9, 9),      # España
+    "51": (9, 9),      # Perú
+    "52": (10, 10),    # México
+    "53": (8, 8),      # Cuba
+    "54": (10, 11),    # Argentina
+    "55": (10, 11),    # Brasil
+    "56": (9, 9),      # Chile
+    "57": (10, 10),    # Colombia
+    "58": (10, 10),    # Venezuela
+    "351": (9, 9),     # Portugal
+    "502": (8, 8),     # Guatemala
+    "503": (8, 8),     # El Salvador
+    "504": (8, 8),     # Honduras
+    "505": (8, 8),     # Nicaragua
+    "506": (8, 8),     # Costa Rica
+    "507": (7, 8),     # Panamá
+    "591": (8, 8),     # Bolivia
+    "593": (8, 9),     # Ecuador
+    "595": (9, 9),     # Paraguay
+    "598": (8, 8),     # Uruguay
+}
+
+# Límites generales de E.164 (dígitos, incluyendo el código de país)
+MIN_DIGITOS_E164 = 8
+MAX_DIGITOS_E164 = 15
+
+
+def limpiar_telefonos(serie: pd.Series) -> pd.Series:
+    """Convierte una columna de teléfonos a texto sin '.0', 'nan' ni espacios"""
+    return (
+        serie.astype(object).where(serie.notna(), "")
+        .astype(str)
+        .str.strip()
+        .str.replace(r"\.0$", "", regex=True)
+    )
+
+
+def normalizar_telefonos(serie: pd.Series, codigo_pais: Optional[str] = "+57") -> pd.DataFrame:
+    """Normaliza una columna completa de teléfonos al formato E.164
+
+    Los números que empiezan por '+' o '00' se toman como internacionales;
+    el resto recibe `codigo_pais` salvo que ya empiecen por ese código y
+    tengan la longitud completa. Con codigo_pais=None todos se consideran
+    internacionales. Retorna un DataFrame con el mismo índice y las
+    columnas "telefono" (+57...), "valido" y "motivo".
+    """
+    texto = limpiar_telefonos(serie)
+    internacional = texto.str.startswith("+") | texto.str.startswith("00")
+    digitos = texto.str.replace(r"\D", "", regex=True)
+    digitos = digitos.where(~texto.str.startswith("00"), digitos.str[2:])
+
+    if codigo_pais is None:
+        completos = digitos
+    else:
+        codigo = "".join(c for c in str(codigo_pais) if c.isdigit())
+        _, maximo = LONGITUDES_NACIONALES.get(codigo, (0, MAX_DIGITOS_E164 - len(codigo)))
+        # Números locales que ya traen el código de país (573001234567)
+        con_codigo = digitos.str.startswith(codigo) & (digitos.str.len() == len(codigo) + maximo)
+        completos = digitos.where(internacional | con_codigo, codigo + digitos)
+
+    longitud = completos.str.len()
+    motivo = pd.Series("", index=serie.index, dtype=object)
+    motivo = motivo.mask(
+        (longitud < MIN_DIGITOS_E164) | (longitud > MAX_DIGITOS_E164),
+        "Longitud inválida"
+    )
+
+    # Validar la longitud nacional según el código de país (el más largo primero)
+    sin_pais = pd.Series(True, index=serie.index)
+    for prefijo in sorted(LONGITUDES_NACIONALES, key=len, reverse=True):
+        minimo, maximo = LONGITUDES_NACIONALES[prefijo]
+        del_pais = sin_pais & completos.str.startswith(prefijo)
+        nacional = longitud - len(prefijo)
+        fuera = del_pais & ((nacional < minimo) | (nacional > maximo)) & (motivo == "")
+        motivo = motivo.mask(fuera, f"Longitud inválida para +{prefijo}")
+        sin_pais &= ~del_pais
+
+    motivo = motivo.mask(digitos == "", "Teléfono vacío")
+    return pd.DataFrame({
+        "telefono": "+" + completos,
+        "valido": motivo == "",
+        "motivo": motivo,
+    }, index=serie.index)
+
+
+def deduplicar(df: pd.DataFrame, columna: str = "telefono") -> Tuple[pd.DataFrame, int]:
+    """Elimina destinatarios repetidos conservando la primera aparición
+
+    Retorna (df sin duplicados, cantidad de filas eliminadas).
+    """
+    repetidos = df.duplicated(subset=[columna], keep="first")
+    return df[~repetidos], int(repetidos.sum())
@@ -0,0 +1,182 @@
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import pandas as pd
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+RUTA_CACHE_LIBROS = os.path.join(ROOT_PATH, "cache", "libros")
+
+# Espacio máximo en disco de la caché; se borran primero las tablas usadas
+# hace más tiempo
+PRESUPUESTO_CACHE = 500 * 1024 * 1024
+
+# Cambiar al modificar cómo leer_excel arma la tabla: invalida lo guardado
+VERSION_FORMATO = 1
+
+# pyarrow está en requirements.txt, pero sin él la aplicación sigue
+# funcionando: la caché queda desactivada (con un aviso)
+PYARROW_DISPONIBLE = importlib.util.find_spec("pyarrow") is not None
+
+TAMANO_LECTURA_HASH = 1024 * 1024
+
+
+class CacheLibros:
+    """Tablas ya leídas de los libros de Excel, en formato Arrow IPC
+
+    Cada tabla se guarda como <hash del contenido>.arrow y se lee con
+    memory-map, sin volver a analizar el XML del libro. Un índice
+    {ruta: tamaño, mtime, hash} evita recalcular el hash mientras el
+    archivo no cambie; si cambia, el hash decide (un libro copiado o solo
+    "tocado" sigue encontrando su tabla). Las tablas que exceden el
+    presupuesto de disco se borran de la menos a la más usada. Segura para
+    hilos; varios procesos pueden compartirla (los reemplazos son atómicos).
+    """
+
+    def __init__(self, ruta: str = RUTA_CACHE_LIBROS, presupuesto: int = PRESUPUESTO_CACHE):
+        self.ruta = ruta
+        self.presupuesto = presupuesto
+        self.archivo_indice = os.path.join(ruta, "indice.json")
+        self._lock = threading.Lock()
+        self._aviso_mostrado = False
+
+    @property
+    def disponible(self) -> bool:
+        if not PYARROW_DISPONIBLE and not self._aviso_mostrado:
+            # Una sola vez: sin pyarrow cada libro se vuelve a leer completo
+            self._aviso_mostrado = True
+            print("⚠️ Caché de libros desactivada: falta pyarrow (pip install -r requirements.txt)")
+        return PYARROW_DISPONIBLE and self.presupuesto > 0
+
+    def _archivo_tabla(self, huella: str) -> str:
+        return os.path.join(self.ruta, f"{huella}.arrow")
+
+    def _leer_indice(self) -> Dict[str, Dict]:
+        try:
+            with open(self.archivo_indice, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _guardar_indice(self, indice: Dict[str, Dict]) -> None:
+        os.makedirs(self.ruta, exist_ok=True)
+        temporal = f"{self.archivo_indice}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(indice, f, ensure_ascii=False)
+        os.replace(temporal, self.archivo_indice)
+
+    def huella(self, ruta_libro: str) -> str:
+        """Hash del contenido del libro (reutilizado si tamaño y mtime no cambian)"""
+        ruta_libro = os.path.abspath(ruta_libro)
+        datos = os.stat(ruta_libro)
+        with self._lock:
+            indice = self._leer_indice()
+            entrada = indice.get(ruta_libro)
+            if (entrada and entrada["tamano"] == datos.st_size
+                    and entrada["mtime"] == datos.st_mtime_ns):
+                return entrada["hash"]
+
+            resumen = hashlib.blake2b(f"v{VERSION_FORMATO}".encode(), digest_size=20)
+            with open(ruta_libro, "rb") as f:
+                for bloque in iter(lambda: f.read(TAMANO_LECTURA_HASH), b""):
+                    resumen.update(bloque)
+            huella = resumen.hexdigest()
+
+            indice[ruta_libro] = {
+                "tamano": datos.st_size, "mtime": datos.st_mtime_ns, "hash": huella
+            }
+            try:
+                self._guardar_indice(indice)
+            except OSError:
+                pass
+            return huella
+
+    def leer(self, ruta_libro: str) -> Optional[pd.DataFrame]:
+        """Retorna la tabla guardada del libro o None si no está en la caché"""
+        if not self.disponible:
+            return None
+        import pyarrow as pa
+
+        try:
+            archivo = self._archivo_tabla(self.huella(ruta_libro))
+            if not os.path.exists(archivo):
+                return None
+            with pa.memory_map(archivo, "r") as fuente:
+                df = pa.ipc.open_file(fuente).read_all().to_pandas()
+            # La fecha de modificación marca el último uso (para el desalojo)
+            os.utime(archivo)
+            return df
+        except (OSError, pa.ArrowException) as e:
+            print(f"⚠️ Caché de libros: no se pudo leer {ruta_libro}: {str(e)}")
+            return None
+
+    def guardar(self, ruta_libro: str, df: pd.DataFrame) -> bool:
+        """Guarda la tabla leída del libro; retorna False si no se pudo"""
+        if not self.disponible:
+            return False
+        import pyarrow as pa
+
+        try:
+            # Columnas con tipos mezclados (número y texto) no tienen tipo Arrow
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, TypeError, ValueError):
+            return False
+
+        try:
+            os.makedirs(self.ruta, exist_ok=True)
+            archivo = self._archivo_tabla(self.huella(ruta_libro))
+            temporal = f"{archivo}.{os.getpid()}.tmp"
+            # Sin compresión: así se puede leer directo del memory-map
+            with pa.OSFile(temporal, "wb") as destino:
+                with pa.ipc.new_file(destino, tabla.schema) as escritor:
+                    escritor.write_table(tabla)
+            os.replace(temporal, archivo)
+        except (OSError, pa.ArrowException) as e:
+            print(f"⚠️ Caché de libros: no se pudo guardar {ruta_libro}: {str(e)}")
+            return False
+
+        self.recortar()
+        return True
+
+    def recortar(self) -> int:
+        """Borra las tablas usadas hace más tiempo hasta cumplir el presupuesto
+
+        Retorna la cantidad de tablas borradas.
+        """
+        with self._lock:
+            try:
+                tablas = [
+                    entrada for entrada in os.scandir(self.ruta)
+                    if entrada.is_file() and entrada.name.endswith(".arrow")
+                ]
+            except OSError:
+                return 0
+            tablas.sort(key=lambda entrada: entrada.stat().st_mtime, reverse=True)
+
+            ocupado = 0
+            borradas = 0
+            for entrada in tablas:
+                ocupado += entrada.stat().st_size
+                if ocupado > self.presupuesto:
+                    try:
+                        os.remove(entrada.path)
+                        borradas += 1
+                    except OSError:
+                        pass
+            return borradas
+
+    def limpiar(self) -> None:
+        """Borra toda la caché"""
+        with self._lock:
+            if not os.path.isdir(self.ruta):
+                return
+            for entrada in os.scandir(self.ruta):
+                if entrada.is_file():
+                    os.remove(entrada.path)
+
+
+# Caché compartida por leer_excel
+CACHE_LIBROS = CacheLibros()
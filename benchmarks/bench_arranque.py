@@ -0,0 +1,83 @@
+"""Mide el arranque de la aplicación en procesos nuevos
+
+Reporta el tiempo de importación de la interfaz, qué módulos pesados se
+cargaron antes de abrir la ventana y, si hay pantalla disponible, el tiempo
+hasta que la ventana se dibuja por primera vez. Termina con código 1 si se
+supera el presupuesto.
+
+Uso: python -m benchmarks.bench_arranque --repeticiones 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Segundos máximos hasta la primera ventana dibujada
+PRESUPUESTO_ARRANQUE = 1.0
+
+# Módulos que no deberían cargarse antes de que el usuario los necesite
+MODULOS_PESADOS = ("pandas", "selenium", "aiohttp", "openpyxl", "webdriver_manager")
+
+SCRIPT_MEDICION = """
+import json, sys, time
+inicio = time.perf_counter()
+from app.core.dependencies import verificar_dependencias
+verificar_dependencias()
+from app.gui.main_window import MainWindow
+importacion = time.perf_counter() - inicio
+cargados = [m for m in %r if m in sys.modules]
+primera_ventana = None
+try:
+    ventana = MainWindow()
+    ventana.update()
+    primera_ventana = time.perf_counter() - inicio
+    ventana.destroy()
+except Exception as e:
+    print(f"Sin pantalla: {e}", file=sys.stderr)
+print(json.dumps({"importacion": importacion, "primera_ventana": primera_ventana, "cargados": cargados}))
+""" % (MODULOS_PESADOS,)
+
+
+def medir() -> dict:
+    salida = subprocess.run(
+        [sys.executable, "-c", SCRIPT_MEDICION],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--presupuesto", type=float, default=PRESUPUESTO_ARRANQUE)
+    args = parser.parse_args()
+
+    mediciones = [medir() for _ in range(args.repeticiones)]
+    importacion = statistics.median(m["importacion"] for m in mediciones)
+    ventanas = [m["primera_ventana"] for m in mediciones if m["primera_ventana"] is not None]
+    cargados = sorted({modulo for m in mediciones for modulo in m["cargados"]})
+
+    print(f"⏱️ Importación de la interfaz (mediana): {importacion * 1000:.0f} ms")
+    if ventanas:
+        primera_ventana = statistics.median(ventanas)
+        print(f"🪟 Primera ventana dibujada (mediana): {primera_ventana * 1000:.0f} ms")
+    else:
+        primera_ventana = importacion
+        print("⚠️ Sin pantalla disponible: solo se midió la importación")
+    if cargados:
+        print(f"⚠️ Módulos pesados cargados al arrancar: {', '.join(cargados)}")
+    else:
+        print("✅ Ningún módulo pesado se cargó al arrancar")
+
+    if primera_ventana > args.presupuesto:
+        print(f"❌ Arranque por encima del presupuesto de {args.presupuesto:.2f} s")
+        sys.exit(1)
+    print(f"✅ Dentro del presupuesto de {args.presupuesto:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
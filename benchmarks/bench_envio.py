@@ -0,0 +1,147 @@
+"""Mide el envío de WhatsApp contra la página falsa local (sin cuenta real)
+
+Ejecuta el enviar_mensaje / verificar_envio reales con Chrome sobre
+fake_whatsapp.html y reporta mensajes por minuto, latencia p50/p95 por
+mensaje y el tiempo de cada fase (los "tiempos" de cada registro).
+También mide esperar_inicio_sesion y si la ventana de bienvenida (--popup)
+quedó cerrada: con sesión existente la cierra la consulta rápida, con
+--sin-sesion (código QR) la cierra manejar_ventanas_emergentes, y una
+ventana tardía (--popup-ms) la cierra enviar_mensaje al interceptar el clic.
+Requiere Chrome instalado.
+
+Uso: python -m benchmarks.bench_envio --mensajes 200 --ligero
+     python -m benchmarks.bench_envio --mensajes 20 --popup 1 --sin-sesion
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import whatsapp_bot
+from benchmarks.fake_whatsapp import iniciar_servidor
+
+# Ventanas de bienvenida mostradas y abiertas en la página actual
+SCRIPT_VENTANAS = """
+return [window.ventanasMostradas || 0, document.querySelectorAll('.fondo-modal').length];
+"""
+
+
+def percentil(valores, fraccion):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(fraccion * (len(ordenados) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de envío por WhatsApp")
+    parser.add_argument("--mensajes", type=int, default=100)
+    parser.add_argument("--invalidos", type=float, default=0.1, help="Fracción de números inválidos")
+    parser.add_argument("--chat-ms", type=int, default=150, help="Demora simulada al abrir el chat")
+    parser.add_argument("--check-ms", type=int, default=100, help="Demora simulada del check")
+    parser.add_argument("--popup", type=float, default=0.0, help="Probabilidad de ventana emergente")
+    parser.add_argument("--popup-ms", type=int, default=0, help="Demora de la ventana emergente")
+    parser.add_argument("--sin-sesion", action="store_true",
+                        help="Perfil nuevo: código QR y manejo de ventanas tras iniciar sesión")
+    parser.add_argument("--qr-ms", type=int, default=500, help="Demora simulada del escaneo del QR")
+    parser.add_argument("--modo", choices=["pegar", "caracter"], default=whatsapp_bot.MODO_ESCRITURA)
+    parser.add_argument("--navegacion", choices=["interna", "recarga"], default=whatsapp_bot.MODO_NAVEGACION)
+    parser.add_argument("--ligero", action="store_true", help="Chrome en modo ligero")
+    parser.add_argument("--salida", help="Guardar los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(
+        chat_ms=args.chat_ms, check_ms=args.check_ms, probabilidad_ventana=args.popup,
+        ventana_ms=args.popup_ms, sesion=not args.sin_sesion, qr_ms=args.qr_ms
+    )
+    whatsapp_bot.URL_WHATSAPP = servidor.url
+
+    driver = whatsapp_bot.configurar_navegador(perfil=None, ligero=args.ligero)
+
+    cada_invalido = round(1 / args.invalidos) if args.invalidos > 0 else 0
+    latencias = []
+    fases = defaultdict(list)
+    confirmados = 0
+    errores = 0
+    try:
+        inicio_sesion = time.perf_counter()
+        if not whatsapp_bot.esperar_inicio_sesion(driver):
+            raise RuntimeError("La página falsa no se cargó")
+        duracion_inicio = time.perf_counter() - inicio_sesion
+        mostradas, abiertas_inicio = driver.execute_script(SCRIPT_VENTANAS)
+
+        inicio_total = time.perf_counter()
+        for i in range(args.mensajes):
+            invalido = cada_invalido and i % cada_invalido == cada_invalido - 1
+            telefono = f"+57300{i:03d}0000" if invalido else f"+57300{i:06d}1"
+            mensaje = f"Hola {i}\nSu factura está vencida.\nGracias"
+
+            registro = whatsapp_bot.enviar_mensaje(
+                driver, telefono, mensaje, modo_escritura=args.modo, modo_navegacion=args.navegacion
+            )
+            latencias.append(registro["tiempos"]["total"])
+            for fase, segundos in registro["tiempos"].items():
+                if fase != "total":
+                    fases[fase].append(segundos)
+            confirmados += registro["confirmado"]
+            errores += registro["estado"] == "Error"
+        duracion = time.perf_counter() - inicio_total
+        # Una ventana tardía aparece durante los envíos. En modo "recarga" la
+        # página ya cambió: solo cuenta si quedó una abierta
+        mostradas_final, abiertas_final = driver.execute_script(SCRIPT_VENTANAS)
+        mostradas = max(mostradas, mostradas_final)
+    finally:
+        driver.quit()
+        servidor.shutdown()
+
+    resultados = {
+        "mensajes": args.mensajes,
+        "confirmados": confirmados,
+        "errores": errores,
+        "inicio_sesion_s": duracion_inicio,
+        "ventana_emergente": {
+            "mostrada": mostradas > 0,
+            "abierta_tras_inicio": abiertas_inicio > 0,
+            "abierta_al_final": abiertas_final > 0,
+        },
+        "duracion_s": duracion,
+        "mensajes_por_minuto": args.mensajes / duracion * 60,
+        "latencia_p50_s": percentil(latencias, 0.50),
+        "latencia_p95_s": percentil(latencias, 0.95),
+        "fases": {
+            fase: {
+                "media_s": sum(valores) / len(valores),
+                "p50_s": percentil(valores, 0.50),
+                "p95_s": percentil(valores, 0.95),
+            }
+            for fase, valores in fases.items()
+        },
+    }
+
+    print(f"\n📊 {confirmados}/{args.mensajes} confirmados en {duracion:.1f} s "
+          f"({resultados['mensajes_por_minuto']:.0f} mensajes/min)")
+    print(f"🔑 Inicio de sesión ({'código QR' if args.sin_sesion else 'sesión existente'}): "
+          f"{duracion_inicio * 1000:.0f} ms, {errores} envíos con error")
+    if mostradas:
+        estado = "abierta" if abiertas_inicio else "cerrada"
+        print(f"🪟 Ventana emergente: {estado} al terminar el inicio de sesión, "
+              f"{'abierta' if abiertas_final else 'cerrada'} al final")
+    print(f"⏱️ Latencia por mensaje: p50 {resultados['latencia_p50_s'] * 1000:.0f} ms, "
+          f"p95 {resultados['latencia_p95_s'] * 1000:.0f} ms")
+    print(f"{'FASE':<14}{'MEDIA':>10}{'P50':>10}{'P95':>10}")
+    for fase, datos in resultados["fases"].items():
+        print(f"{fase:<14}{datos['media_s'] * 1000:>8.0f}ms{datos['p50_s'] * 1000:>8.0f}ms"
+              f"{datos['p95_s'] * 1000:>8.0f}ms")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+        print(f"📄 Resultados guardados en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Mide el envío masivo de SMSService contra la pasarela falsa local
+
+Uso: python -m benchmarks.bench_sms --total 10000 --batch-size 1
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.sms_sender import SMSService
+from benchmarks.fake_sms_gateway import crear_aplicacion
+
+
+def iniciar_pasarela(app: web.Application, puerto: int) -> None:
+    """Levanta la pasarela en un hilo aparte con su propio event loop"""
+    listo = threading.Event()
+
+    def ejecutar():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", puerto).start())
+        listo.set()
+        loop.run_forever()
+
+    threading.Thread(target=ejecutar, daemon=True).start()
+    listo.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de envío SMS")
+    parser.add_argument("--total", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=8085)
+    args = parser.parse_args()
+
+    app = crear_aplicacion(args.latency, args.failure_rate)
+    iniciar_pasarela(app, args.port)
+
+    servicio = SMSService()
+    servicio.configure(
+        "clave-de-prueba",
+        api_url=f"http://127.0.0.1:{args.port}/sms",
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency,
+        max_connections=args.concurrency
+    )
+    envios = [(f"+5730000{i:05d}", f"Mensaje de prueba {i}") for i in range(args.total)]
+
+    inicio = time.perf_counter()
+    registros = servicio.send_messages(envios)
+    duracion = time.perf_counter() - inicio
+
+    exitosos = sum(1 for r in registros if r["confirmado"])
+    estadisticas = app["estadisticas"]
+    print(f"📊 {exitosos}/{args.total} SMS enviados en {duracion:.2f} s "
+          f"({args.total / duracion:.0f} SMS/s)")
+    print(f"🔁 Solicitudes: {estadisticas['solicitudes']} "
+          f"(rechazadas por la pasarela: {estadisticas['rechazadas']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Pasarela SMS falsa para pruebas locales de SMSService
+
+Acepta envíos individuales ({"to", "message"}) y por lotes
+({"messages": [...]}), con latencia simulada y una fracción de
+respuestas 503 para ejercitar los reintentos.
+
+Uso: python -m benchmarks.fake_sms_gateway --port 8085 --latency 0.05
+"""
+import argparse
+import asyncio
+import itertools
+import random
+
+from aiohttp import web
+
+
+def crear_aplicacion(latencia: float = 0.05, tasa_fallos: float = 0.0) -> web.Application:
+    contador = itertools.count(1)
+    estadisticas = {"solicitudes": 0, "mensajes": 0, "rechazadas": 0}
+
+    def aceptar(mensaje):
+        estadisticas["mensajes"] += 1
+        if not str(mensaje.get("to", "")).startswith("+"):
+            return {"to": mensaje.get("to"), "status": "rejected", "error": "Número inválido"}
+        return {"to": mensaje["to"], "status": "accepted", "id": f"sms-{next(contador)}"}
+
+    async def enviar(request: web.Request) -> web.Response:
+        estadisticas["solicitudes"] += 1
+        await asyncio.sleep(latencia)
+        if random.random() < tasa_fallos:
+            estadisticas["rechazadas"] += 1
+            return web.json_response({"error": "Servicio saturado"}, status=503)
+        datos = await request.json()
+        if "messages" in datos:
+            return web.json_response({"results": [aceptar(m) for m in datos["messages"]]})
+        return web.json_response(aceptar(datos))
+
+    async def ver_estadisticas(request: web.Request) -> web.Response:
+        return web.json_response(estadisticas)
+
+    app = web.Application()
+    app["estadisticas"] = estadisticas
+    app.router.add_post("/sms", enviar)
+    app.router.add_get("/estadisticas", ver_estadisticas)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pasarela SMS falsa")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--latency", type=float, default=0.05, help="Segundos por solicitud")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fracción de respuestas 503")
+    args = parser.parse_args()
+    web.run_app(crear_aplicacion(args.latency, args.failure_rate), port=args.port)
@@ -0,0 +1,92 @@
+"""Servidor local con una página falsa de WhatsApp Web
+
+Sirve fake_whatsapp.html en cualquier ruta (/, /send?phone=...) con los
+tiempos simulados configurados. Los números que terminan en
+`sufijo_invalido` muestran el aviso de número inválido. Los enlaces
+api.whatsapp.com/send se interceptan y cambian de chat sin recargar.
+Con `sesion=False` la página simula un perfil nuevo: muestra el código QR
+y lo da por escaneado tras `qr_ms`. La ventana de bienvenida aparece con
+`probabilidad_ventana`, `ventana_ms` después de cargar la aplicación.
+
+Uso: python -m benchmarks.fake_whatsapp --port 8090
+"""
+import argparse
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PLANTILLA_PAGINA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_whatsapp.html")
+
+
+def renderizar_pagina(
+    chat_ms: int = 150,
+    chat_interno_ms: int = 20,
+    check_ms: int = 100,
+    doble_check_ms: int = 200,
+    sufijo_invalido: str = "0000",
+    probabilidad_ventana: float = 0.0,
+    ventana_ms: int = 0,
+    sesion: bool = True,
+    qr_ms: int = 500
+) -> bytes:
+    with open(PLANTILLA_PAGINA, "r", encoding="utf-8") as f:
+        pagina = f.read()
+    valores = {
+        "__CHAT_MS__": str(chat_ms),
+        "__CHAT_INTERNO_MS__": str(chat_interno_ms),
+        "__CHECK_MS__": str(check_ms),
+        "__DOBLE_CHECK_MS__": str(doble_check_ms),
+        "__SUFIJO_INVALIDO__": sufijo_invalido,
+        "__PROBABILIDAD_VENTANA__": str(probabilidad_ventana),
+        "__VENTANA_MS__": str(ventana_ms),
+        "__SESION__": "true" if sesion else "false",
+        "__QR_MS__": str(qr_ms),
+    }
+    for marcador, valor in valores.items():
+        pagina = pagina.replace(marcador, valor)
+    return pagina.encode("utf-8")
+
+
+def iniciar_servidor(puerto: int = 0, **configuracion) -> ThreadingHTTPServer:
+    """Levanta el servidor en un hilo aparte. Con puerto 0 se elige uno libre;
+    la URL base queda en `servidor.url`."""
+    contenido = renderizar_pagina(**configuracion)
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/favicon"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(contenido)))
+            self.end_headers()
+            self.wfile.write(contenido)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), Manejador)
+    servidor.url = f"http://127.0.0.1:{servidor.server_address[1]}/"
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Página falsa de WhatsApp Web")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--chat-ms", type=int, default=150)
+    parser.add_argument("--popup", type=float, default=0.0, help="Probabilidad de ventana emergente")
+    parser.add_argument("--popup-ms", type=int, default=0, help="Demora de la ventana emergente")
+    parser.add_argument("--sin-sesion", action="store_true", help="Simular un perfil nuevo (código QR)")
+    args = parser.parse_args()
+    servidor = iniciar_servidor(
+        args.port, chat_ms=args.chat_ms, probabilidad_ventana=args.popup,
+        ventana_ms=args.popup_ms, sesion=not args.sin_sesion
+    )
+    print(f"🌐 WhatsApp falso en {servidor.url} (Ctrl+C para salir)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -1,11 +1,12 @@
 import os
-from app.gui.main_window import MainWindow
-from app.core.whatsapp_bot import verificar_dependencias
+from app.core.dependencies import verificar_dependencias
 
 def main():
     """Punto de entrada principal de la aplicación"""
     if verificar_dependencias():
         try:
+            # Se importa después de verificar: customtkinter podría faltar
+            from app.gui.main_window import MainWindow
             app = MainWindow()
             app.mainloop()
         except Exception as e:
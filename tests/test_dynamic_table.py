@@ -0,0 +1,105 @@
+import pandas as pd
+
+from app.gui.components.dynamic_table import DynamicTable
+
+
+class VistaFalsa:
+    """Lo mínimo del Treeview que usa DynamicTable, sin pantalla"""
+
+    def __init__(self):
+        self.items = {}
+
+    def insert(self, parent, index, iid, values):
+        self.items[iid] = values
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.items.pop(iid, None)
+
+    def get_children(self):
+        return list(self.items)
+
+    def exists(self, iid):
+        return iid in self.items
+
+    def item(self, iid, values):
+        self.items[iid] = values
+
+    def set(self, *args):
+        pass
+
+
+def tabla_con(df):
+    """DynamicTable con `df` y una vista falsa (sin crear widgets de Tk)"""
+    tabla = DynamicTable.__new__(DynamicTable)
+    tabla.df = df
+    tabla.version = 0
+    tabla.pending_rows = 0
+    tabla.offset = 0
+    tabla.visible_rows = 25
+    tabla.cell_editor = None
+    tabla.table = VistaFalsa()
+    tabla.y_scroll = VistaFalsa()
+    tabla.render_window()
+    return tabla
+
+
+def test_editar_celda_booleana_conserva_el_tipo():
+    tabla = tabla_con(pd.DataFrame({"TELEFONO": ["1", "2"], "ACTIVO": [True, True]}))
+
+    tabla.set_cell(0, "ACTIVO", "False")
+    tabla.set_cell(1, "ACTIVO", "no")
+
+    assert tabla.df["ACTIVO"].dtype == bool
+    assert tabla.df["ACTIVO"].tolist() == [False, False]
+
+
+def test_vaciar_celda_booleana_usa_booleano_con_nulos():
+    tabla = tabla_con(pd.DataFrame({"ACTIVO": [True, False]}))
+
+    tabla.set_cell(0, "ACTIVO", "")
+
+    assert tabla.df["ACTIVO"].dtype == "boolean"
+    assert tabla.df["ACTIVO"].isna().tolist() == [True, False]
+
+
+def test_texto_en_columna_booleana_pasa_a_object():
+    tabla = tabla_con(pd.DataFrame({"ACTIVO": [True, False]}))
+
+    tabla.set_cell(0, "ACTIVO", "quizás")
+
+    assert tabla.df["ACTIVO"].tolist() == ["quizás", False]
+
+
+def test_decimal_en_columna_de_enteros_la_amplia():
+    tabla = tabla_con(pd.DataFrame({"DEUDA": [1, 2]}))
+
+    tabla.set_cell(0, "DEUDA", "2.5")
+
+    assert tabla.df["DEUDA"].tolist() == [2.5, 2.0]
+
+
+def test_filas_vacias_se_agregan_sin_copiar_y_conservan_tipos():
+    df = pd.DataFrame({
+        "TELEFONO": ["1"], "DEUDA": [10], "ACTIVO": [True],
+        "FECHA": pd.to_datetime(["2024-01-01"]),
+    })
+    tabla = tabla_con(df)
+
+    tabla.add_empty_row()
+    tabla.add_empty_row()
+
+    # Las filas vacías no copian el DataFrame ni cambian lo que se envía
+    assert tabla.df is df
+    assert tabla.row_count() == 3
+    assert tabla.table.items["2"] == ("", "", "", "")
+    assert tabla.get_data() is df
+
+    tabla.set_cell(2, "DEUDA", "7")
+
+    assert len(tabla.df) == 3
+    assert tabla.df["DEUDA"].dtype == "Int64"
+    assert tabla.df["DEUDA"].tolist() == [10, pd.NA, 7]
+    assert tabla.df["ACTIVO"].dtype == "boolean"
+    assert pd.api.types.is_datetime64_any_dtype(tabla.df["FECHA"])
+    assert len(tabla.get_data()) == 2
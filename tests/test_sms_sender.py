@@ -0,0 +1,48 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.core.sms_sender import SMSService
+
+
+def enviar_contra_pasarela(manejador, envios):
+    """Envía con SMSService contra una pasarela falsa local y retorna
+    (registros, solicitudes recibidas)"""
+    solicitudes = []
+
+    async def enviar(request):
+        solicitudes.append(await request.json())
+        return await manejador(request)
+
+    async def ejecutar():
+        app = web.Application()
+        app.router.add_post("/sms", enviar)
+        async with TestServer(app) as servidor:
+            servicio = SMSService()
+            servicio.configure("clave", str(servidor.make_url("/sms")))
+            return await servicio.send_messages_async(envios)
+
+    return asyncio.run(ejecutar()), solicitudes
+
+
+def test_respuesta_2xx_sin_json_queda_sin_confirmar():
+    async def texto_plano(request):
+        return web.Response(text="OK", content_type="text/plain")
+
+    registros, solicitudes = enviar_contra_pasarela(texto_plano, [("+573001112233", "Hola")])
+
+    assert registros[0]["estado"] == "Sin confirmar"
+    assert registros[0]["confirmado"] is False
+    # Aceptada por la pasarela: no se reintenta (el SMS pudo haber salido)
+    assert len(solicitudes) == 1
+
+
+def test_json_con_content_type_de_texto_se_acepta():
+    async def json_como_texto(request):
+        return web.Response(text='{"id": "sms-1", "status": "accepted"}', content_type="text/plain")
+
+    registros, _ = enviar_contra_pasarela(json_como_texto, [("+573001112233", "Hola")])
+
+    assert registros[0]["estado"] == "Éxito"
+    assert registros[0]["confirmado"] is True